@@ -1,18 +1,175 @@
 #!/usr/bin/env python
-import datetime as dt
-from factor_momentum import FactorMomentumSignal
+"""
+Chunked, resumable factor momentum backtest.
+
+Alphas are generated and optimized one calendar year at a time. While
+a year is being optimized, the next year's alphas are built in a
+background thread. Each finished year is written to a Hive-partitioned
+Parquet dataset (out/year=YYYY/weights.parquet) and recorded in
+out/manifest.json, so a re-run after a timeout or OOM skips the years
+that are already done:
+
+    python backtest.py --type "1m cross-section" --start 2001-01-01 --end 2020-01-01
 
-import sf_quant.backtester as sfb
-import sf_quant.optimizer as sfo
+With --daily the alphas are daily (exposures as-of joined onto the
+latest monthly factor signal) and every trading day is optimized.
 
-from dotenv import load_dotenv
+Read the result with load_weights(out).
+"""
+import argparse
+import datetime as dt
+import json
 import os
+from concurrent.futures import ThreadPoolExecutor
+
+import polars as pl
+
+from factor_momentum import FactorMomentumSignal, get_factors, get_tmp, scan_factors
+
+
+MANIFEST = "manifest.json"
+
+
+def year_chunks(start: dt.date, end: dt.date) -> list[tuple[dt.date, dt.date]]:
+    """
+    [start, end] split into calendar years, each running from its first
+    to its last trading day (the dates with factor returns). Years
+    without trading days in the range are left out, so a range that
+    starts or ends on a holiday never yields an empty chunk.
+    """
+
+    # The same factors the chunks load, so a cold factor cache is
+    # filled once with every column.
+    days = (scan_factors(start, end, get_factors())
+    .select('date')
+    .group_by(pl.col('date').dt.year().alias('year')).agg(
+        pl.col('date').min().alias('first'),
+        pl.col('date').max().alias('last'),
+    )
+    .sort('year')
+    .collect()
+    )
+
+    return list(zip(days['first'].to_list(), days['last'].to_list()))
+
+
+def read_manifest(root: str) -> dict | None:
+    path = os.path.join(root, MANIFEST)
+    if not os.path.exists(path):
+        return None
+
+    with open(path) as f:
+        return json.load(f)
+
+
+def write_manifest(root: str, manifest: dict) -> None:
+    # Written to a temporary file and swapped in, so a kill mid-write
+    # leaves the previous manifest intact.
+    path = os.path.join(root, MANIFEST)
+    with open(f"{path}.tmp", "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(f"{path}.tmp", path)
+
+
+def load_weights(root: str) -> pl.LazyFrame:
+    """
+    All finished chunks of the weights dataset at root.
+    """
+
+    return pl.scan_parquet(os.path.join(root, "year=*", "*.parquet"), hive_partitioning=True)
+
+
+def run_chunked(
+        signal: FactorMomentumSignal, start: dt.date, end: dt.date, root: str,
+        constraints: list, gamma: float = 2, n_cpus: int | None = None, config: dict | None = None,
+        daily: bool = False
+) -> dict:
+    """
+    Backtest [start, end] year by year into the dataset at root and
+    return the manifest. Years already recorded in the manifest (with
+    their file present) are skipped. config identifies the run; an
+    existing manifest with a different config is refused rather than
+    mixed into. daily optimizes daily instead of monthly alphas.
+    """
+
+    import sf_quant.backtester as sfb
+
+    os.makedirs(root, exist_ok=True)
+
+    config = config or {}
+    manifest = read_manifest(root) or {"config": config, "chunks": {}}
+    if manifest["config"] != config:
+        raise ValueError(
+            f"{root} holds a backtest with config {manifest['config']}, not {config}. "
+            "Use another output directory or delete it."
+        )
+
+    # A chunk counts as done only if it covered the same trading days (a
+    # year cut short by an earlier end date is redone) and its file exists.
+    done = manifest["chunks"]
+    todo = [
+        (s, e) for s, e in year_chunks(start, end)
+        if not (
+            str(s.year) in done
+            and done[str(s.year)]["end"] == e.isoformat()
+            and os.path.exists(os.path.join(root, done[str(s.year)]["path"]))
+        )
+    ]
+
+    if not todo:
+        print(f"All {len(done)} chunks in {root} are done.")
+        return manifest
+
+    print(f"{len(done)} chunks done, {len(todo)} to go.")
+
+    get_alphas = signal.get_alpha_daily if daily else signal.get_alpha_monthly_since
+
+    with ThreadPoolExecutor(max_workers=1) as prefetch:
+        pending = prefetch.submit(get_alphas, *todo[0])
+
+        for i, (s, e) in enumerate(todo):
+            alphas = pending.result()
+            if i + 1 < len(todo):
+                pending = prefetch.submit(get_alphas, *todo[i + 1])
+
+            if alphas.is_empty():
+                print(f"{s.year}: no alphas, skipping.")
+                continue
+
+            weights = sfb.backtest_parallel(alphas, constraints=constraints, gamma=gamma, n_cpus=n_cpus)
+
+            rel = os.path.join(f"year={s.year}", "weights.parquet")
+            path = os.path.join(root, rel)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            weights.write_parquet(f"{path}.tmp")
+            os.replace(f"{path}.tmp", path)
+
+            done[str(s.year)] = {
+                "start": s.isoformat(),
+                "end": e.isoformat(),
+                "path": rel,
+                "rows": weights.height,
+                "finished": dt.datetime.now().isoformat(timespec="seconds"),
+            }
+            write_manifest(root, manifest)
+            print(f"{s.year}: {weights.height} weights written.")
+
+    return manifest
 
-load_dotenv()
-write_out = os.getenv('TMP')
 
 def main():
-    
+    import sf_quant.optimizer as sfo
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--type", default="1m cross-section")
+    parser.add_argument("--start", type=dt.date.fromisoformat, default=dt.date(2001, 1, 1))
+    parser.add_argument("--end", type=dt.date.fromisoformat, default=dt.date(2020, 1, 1))
+    parser.add_argument("--gamma", type=float, default=2)
+    parser.add_argument("--n-cpus", type=int, default=4)
+    parser.add_argument("--daily", action="store_true", help="rebalance daily instead of monthly")
+    parser.add_argument("--out", default=None, help="weights dataset directory (default: TMP/fm_weights)")
+    args = parser.parse_args()
+
     constraints = [
         sfo.FullInvestment(),
         sfo.LongOnly(),
@@ -20,20 +177,24 @@ def main():
         sfo.UnitBeta()
     ]
 
-    start, end = dt.date(2001,1,1), dt.date(2020,1,1)
-    
-    signal = FactorMomentumSignal(type="cross section")
-    
-    weights = sfb.backtest_parallel(
-        signal.get_alpha_monthly(start=start, end=end),
-        constraints=constraints,
-        gamma=2,
-        n_cpus=4
-        )
-    
-    weights.write_parquet(f'{write_out}/fm_weights.parquet')
+    root = args.out
+    if root is None:
+        if get_tmp() is None:
+            raise ValueError("No --out given and TMP is not set.")
+        root = os.path.join(get_tmp(), "fm_weights")
+
+    signal = FactorMomentumSignal(type=args.type)
+
+    run_chunked(
+        signal, args.start, args.end, root, constraints, gamma=args.gamma, n_cpus=args.n_cpus, daily=args.daily,
+        config={
+            "type": args.type,
+            "daily": args.daily,
+            "gamma": args.gamma,
+            "constraints": [type(c).__name__ for c in constraints],
+        },
+    )
 
 
 if __name__ == "__main__":
     main()
-    
\ No newline at end of file
@@ -0,0 +1,364 @@
+"""
+Offline benchmarks for the PCA engine, the signal construction steps,
+alpha_monthly and the FactorMomentumService pipelines.
+
+Everything runs on synthetic data (see benchmarks/synthetic.py), so no
+sf_quant access is needed. Each case runs in a fresh process and
+reports wall times over --repeat runs, the peak memory traced by
+tracemalloc for one run and the process's peak RSS. Results are
+written as JSON with the commit they were measured at, so two runs can
+be compared with --compare:
+
+    PYTHONPATH=src python -m benchmarks.run --days 10000 --factors 50 --assets 5000
+    PYTHONPATH=src python -m benchmarks.run --only pca --compare benchmarks/results/<baseline>.json
+
+--factors sets the width of the PCA cases. The signal, alpha and
+service cases use the real FACTORS list, and build asset panels over
+the last --asset-days trading days only. The import case times a cold
+`import factor_momentum` against IMPORT_BUDGET_S; the run exits
+non-zero when a budgeted case is over.
+"""
+
+import argparse
+import contextlib
+import datetime as dt
+import io
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable
+
+import numpy as np
+import polars as pl
+
+from benchmarks.synthetic import SyntheticWorld, factor_returns
+
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+CASES = {}
+
+# Wall time of `python -c "import factor_momentum"`, interpreter start-up
+# included. Importing the package must not load sklearn, sf_quant, tqdm or
+# .env, nor query the data layer.
+IMPORT_BUDGET_S = 0.75
+HEAVY_MODULES = ["sklearn", "sf_quant", "tqdm", "dotenv", "pyarrow"]
+
+
+def case(name: str, group: str, budget_s: float | None = None):
+    """
+    Register a benchmark. The decorated function takes the config and
+    returns the callable to time; everything before that is setup. A
+    case with budget_s is flagged (and the run exits non-zero) when its
+    median time exceeds the budget.
+    """
+
+    def register(build: Callable[[dict], Callable[[], object]]):
+        CASES[name] = (group, build, budget_s)
+        return build
+
+    return register
+
+
+@case("import/factor_momentum", "import", budget_s=IMPORT_BUDGET_S)
+def _import_case(config: dict) -> Callable[[], object]:
+    code = (
+        "import sys, factor_momentum\n"
+        f"heavy = [m for m in {HEAVY_MODULES!r} if m in sys.modules]\n"
+        "sys.exit(f'import factor_momentum loaded {heavy}' if heavy else 0)"
+    )
+
+    def run():
+        result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True)
+        if result.returncode != 0:
+            raise RuntimeError(result.stderr.strip())
+
+    return run
+
+
+def _world(config: dict) -> SyntheticWorld:
+    from factor_momentum import FACTORS
+
+    world = SyntheticWorld(config["days"], config["assets"], FACTORS, seed=config["seed"])
+    world.install()
+
+    return world
+
+
+def _asset_range(world: SyntheticWorld, config: dict) -> tuple[dt.date, dt.date]:
+    return world.dates[-min(config["asset_days"], len(world.dates))], world.end
+
+
+def _pca_case(mode: str, solver: str, window: str):
+    def build(config: dict) -> Callable[[], object]:
+        from factor_momentum import PcaEngine
+
+        factors = [f"F{i:03d}" for i in range(config["factors"])]
+        frame = factor_returns(config["days"], factors, seed=config["seed"])
+        returns, start = frame.lazy(), frame['date'][0]
+
+        def run():
+            engine = PcaEngine(config["components"], config["lookback"], mode=mode, solver=solver)
+            engine.progress = False
+
+            if window == "rolling":
+                return engine.fit_transform_rolling_monthly(returns)
+            return engine.fit_transform_expanding_monthly(start, returns)
+
+        return run
+
+    return build
+
+
+for _mode, _solver in [("refit", "eigh"), ("incremental", "eigh"), ("batched", "eigh"), ("incremental", "subspace")]:
+    for _window in ["rolling", "expanding"]:
+        if _window == "expanding" and _solver == "subspace":
+            continue
+        _name = f"pca/{_window}/{_mode}" + ("-subspace" if _solver == "subspace" else "")
+        case(_name, "pca")(_pca_case(_mode, _solver, _window))
+
+
+def _factor_signal_case(type: str):
+    def build(config: dict) -> Callable[[], object]:
+        from factor_momentum import construct_factor_signal_monthly
+        from factor_momentum._loaders import _scan_monthly_factor_returns
+
+        world = _world(config)
+        monthly = _scan_monthly_factor_returns(world.start, world.end).collect().lazy()
+
+        return lambda: construct_factor_signal_monthly(monthly, type)
+
+    return build
+
+
+def _asset_signal_case(type: str):
+    def build(config: dict) -> Callable[[], object]:
+        from factor_momentum import construct_asset_signal_monthly
+        from factor_momentum._wrappers import factorspace_signals_monthly
+        from factor_momentum._loaders import _load_monthly_asset_data
+
+        world = _world(config)
+        start, end = _asset_range(world, config)
+
+        signals = factorspace_signals_monthly(world.start, world.end, type)
+        assets = _load_monthly_asset_data(start, end)
+
+        return lambda: construct_asset_signal_monthly(signals, assets)
+
+    return build
+
+
+def _alpha_case(type: str):
+    def build(config: dict) -> Callable[[], object]:
+        from factor_momentum._wrappers import alpha_monthly
+
+        world = _world(config)
+        start, end = _asset_range(world, config)
+
+        return lambda: alpha_monthly(start, end, type)
+
+    return build
+
+
+def _alpha_daily_case(type: str):
+    def build(config: dict) -> Callable[[], object]:
+        from factor_momentum import alpha_daily
+
+        world = _world(config)
+        start, end = _asset_range(world, config)
+
+        return lambda: alpha_daily(start, end, type)
+
+    return build
+
+
+def _service_case(window: str, mode: str):
+    def build(config: dict) -> Callable[[], object]:
+        from research.factor_momentum_service import FactorMomentumService, Interval
+
+        world = _world(config)
+
+        def run():
+            service = FactorMomentumService(world.start, world.end)
+            if window == "rolling":
+                return service.run_rolling_pipeline(config["components"], config["lookback"], Interval.MONTHLY, mode=mode)
+            return service.run_expanding_pipeline(config["components"], mode=mode)
+
+        return run
+
+    return build
+
+
+for _type in ["1m cross-section", "12m time-series continuous", "12m time-series discrete"]:
+    _slug = _type.replace(" ", "-")
+    case(f"signal/factor/{_slug}", "signal")(_factor_signal_case(_type))
+    case(f"signal/asset/{_slug}", "signal")(_asset_signal_case(_type))
+    case(f"alpha/{_slug}", "alpha")(_alpha_case(_type))
+    case(f"alpha/daily/{_slug}", "alpha")(_alpha_daily_case(_type))
+
+for _window in ["rolling", "expanding"]:
+    for _mode in ["refit", "batched"]:
+        case(f"service/{_window}/{_mode}", "service")(_service_case(_window, _mode))
+
+
+def run_case(name: str, config: dict) -> dict:
+    """
+    Set up and time one case in the current process.
+    """
+
+    group, build, budget = CASES[name]
+
+    with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+        t0 = time.perf_counter()
+        run = build(config)
+        setup = time.perf_counter() - t0
+
+        times = []
+        for _ in range(config["repeat"]):
+            t0 = time.perf_counter()
+            run()
+            times.append(time.perf_counter() - t0)
+
+        tracemalloc.start()
+        run()
+        _, traced_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    return {
+        "name": name,
+        "group": group,
+        "setup_s": setup,
+        "times_s": times,
+        "median_s": statistics.median(times),
+        "min_s": min(times),
+        "peak_traced_mb": traced_peak / 2**20,
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 2**10,
+        "budget_s": budget,
+        "over_budget": None if budget is None else statistics.median(times) > budget,
+    }
+
+
+def _commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(baseline: dict, current: dict, threshold: float = 1.1) -> pl.DataFrame:
+    """
+    Median-time ratio (current / baseline) per case present in both,
+    flagging ratios above threshold as regressions.
+    """
+
+    old = {r["name"]: r for r in baseline["results"]}
+
+    rows = [
+        {
+            "name": r["name"],
+            "baseline_s": old[r["name"]]["median_s"],
+            "current_s": r["median_s"],
+            "ratio": r["median_s"] / old[r["name"]]["median_s"],
+            "baseline_rss_mb": old[r["name"]]["peak_rss_mb"],
+            "current_rss_mb": r["peak_rss_mb"],
+        }
+        for r in current["results"] if r["name"] in old
+    ]
+
+    return (pl.DataFrame(rows)
+    .with_columns(
+        (pl.col('ratio') > threshold).alias('regression')
+    )
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--days", type=int, default=10_000, help="trading days of factor returns (T)")
+    parser.add_argument("--factors", type=int, default=50, help="factors in the PCA cases (F)")
+    parser.add_argument("--assets", type=int, default=5_000, help="assets in the synthetic universe (N)")
+    parser.add_argument("--asset-days", type=int, default=756, help="trading days of asset data in the signal and alpha cases")
+    parser.add_argument("--components", type=int, default=5)
+    parser.add_argument("--lookback", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--only", nargs="*", default=None, help="run cases whose name contains any of these")
+    parser.add_argument("--in-process", action="store_true", help="run every case in this process (peak RSS is then cumulative)")
+    parser.add_argument("--output", default=None, help="JSON path (default: benchmarks/results/<timestamp>-<commit>.json)")
+    parser.add_argument("--compare", default=None, help="baseline JSON to compare against")
+    args = parser.parse_args()
+
+    config = {
+        "days": args.days,
+        "factors": args.factors,
+        "assets": args.assets,
+        "asset_days": args.asset_days,
+        "components": args.components,
+        "lookback": args.lookback,
+        "repeat": args.repeat,
+        "seed": args.seed,
+    }
+
+    names = [name for name in CASES if not args.only or any(part in name for part in args.only)]
+
+    results = []
+    for name in names:
+        print(f"{name} ...", flush=True)
+
+        if args.in_process:
+            result = run_case(name, config)
+        else:
+            # A fresh spawned process per case keeps peak RSS per case and
+            # avoids forking a process that already runs polars threads.
+            with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as pool:
+                result = pool.submit(run_case, name, config).result()
+
+        print(f"    median {result['median_s']:.3f}s, peak RSS {result['peak_rss_mb']:.0f} MB", flush=True)
+        results.append(result)
+
+    commit = _commit()
+    report = {
+        "meta": {
+            "commit": commit,
+            "timestamp": dt.datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "polars": pl.__version__,
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "config": config,
+        },
+        "results": results,
+    }
+
+    path = args.output or os.path.join(
+        RESULTS_DIR, f"{dt.datetime.now():%Y%m%dT%H%M%S}-{(commit or 'nocommit')[:10]}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+
+    print(f"Wrote {path}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            print(compare(json.load(f), report))
+
+    over = [r["name"] for r in results if r["over_budget"]]
+    if over:
+        sys.exit(f"Over budget: {', '.join(over)}")
+
+
+if __name__ == "__main__":
+    main()
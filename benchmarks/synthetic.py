@@ -0,0 +1,128 @@
+"""
+Synthetic data provider for the benchmarks.
+
+Factor returns come from a low-rank factor model plus noise, so the
+PCA has real structure to find. Asset panels and exposures are drawn
+per trading day from a generator seeded by (seed, day), which makes any
+date range reproducible on its own: the chunked loaders can request one
+year at a time without the full T x N panel ever being held in memory.
+"""
+
+import datetime as dt
+
+import numpy as np
+import polars as pl
+
+from factor_momentum import DataProvider, set_provider
+
+
+START = dt.date(1985, 1, 1)
+
+
+def trading_days(n_days: int, start: dt.date = START) -> pl.Series:
+    """
+    The first n_days weekdays from start.
+    """
+
+    days = pl.date_range(start, start + dt.timedelta(days=n_days * 7 // 5 + 7), "1d", eager=True)
+
+    return days.filter(days.dt.weekday() <= 5)[:n_days].alias("date")
+
+
+def factor_returns(
+        n_days: int, factors: list[str], seed: int = 0, n_latent: int = 5, start: dt.date = START
+) -> pl.DataFrame:
+    """
+    Daily factor returns in percent (date plus one column per factor),
+    driven by n_latent common shocks plus idiosyncratic noise.
+    """
+
+    rng = np.random.default_rng(seed)
+    dates = trading_days(n_days, start)
+
+    loadings = rng.normal(size=(len(factors), n_latent))
+    X = rng.normal(size=(n_days, n_latent)) @ loadings.T * 0.3 + rng.normal(size=(n_days, len(factors))) * 0.2
+
+    return pl.DataFrame({"date": dates, **{fac: X[:, i] for i, fac in enumerate(factors)}})
+
+
+class SyntheticWorld(DataProvider):
+    """
+    A reproducible universe of n_assets assets over n_days trading
+    days, served as a DataProvider. It is generated on demand, so the
+    loaders' Parquet cache is not used for it.
+    """
+
+    def __init__(self, n_days: int, n_assets: int, factors: list[str], seed: int = 0):
+        self.dates = trading_days(n_days)
+        self.n_assets = n_assets
+        self.factors = factors
+        self.seed = seed
+        self.barrids = [f"SYN{i:05d}" for i in range(n_assets)]
+        self.factor_returns = factor_returns(n_days, factors, seed)
+
+
+    @property
+    def start(self) -> dt.date:
+        return self.dates[0]
+
+
+    @property
+    def end(self) -> dt.date:
+        return self.dates[-1]
+
+
+    def _panel(self, start: dt.date, end: dt.date, columns: list[str], draw) -> pl.DataFrame:
+        dates = self.dates.filter(self.dates.is_between(start, end))
+        N = self.n_assets
+
+        frames = []
+        for date in dates.to_list():
+            rng = np.random.default_rng([self.seed, date.toordinal()])
+            frames.append(pl.DataFrame({
+                "date": pl.repeat(date, N, eager=True),
+                "barrid": self.barrids,
+                **draw(rng, N),
+            }))
+
+        if not frames:
+            return pl.DataFrame(schema={c: pl.Date if c == "date" else pl.String if c == "barrid" else pl.Float64 for c in columns})
+
+        return pl.concat(frames).select(columns)
+
+
+    def fingerprint(self) -> str:
+        return f"{super().fingerprint()}:{len(self.dates)}:{self.n_assets}:{self.factors}:{self.seed}"
+
+
+    def factor_names(self, type: str = "style") -> list[str]:
+        return self.factors
+
+
+    def load_assets(self, start: dt.date, end: dt.date, columns: list[str]) -> pl.DataFrame:
+        return self._panel(start, end, columns, lambda rng, N: {
+            "return": rng.normal(0.05, 2.0, N),
+            "market_cap": rng.lognormal(21, 1.5, N),
+            "specific_risk": rng.uniform(15, 60, N),
+        })
+
+
+    def load_exposures(self, start: dt.date, end: dt.date, columns: list[str]) -> pl.DataFrame:
+        return self._panel(start, end, columns, lambda rng, N: {
+            fac: rng.normal(size=N) for fac in self.factors
+        })
+
+
+    def load_factors(self, start: dt.date, end: dt.date, factors: list[str]) -> pl.DataFrame:
+        return (self.factor_returns
+        .filter(pl.col('date').is_between(start, end))
+        .select(['date'] + factors)
+        )
+
+
+    def install(self) -> None:
+        """
+        Make this world the data provider for the current process.
+        """
+
+        set_provider(self)
@@ -1,24 +1,179 @@
 import polars as pl
 import numpy as np
 import datetime as dt
+import hashlib
+import os
+from typing import Callable, Iterator
 
-from tqdm import tqdm
+from ._moments import SlidingMoments, CumulativeMoments
+from ._eigen import top_components, top_components_batched, subspace_components, align_sequence
+from ._parallel import fit_parallel
+from ._state_cache import StateCache
+from ._pca_states import PcaStates
+from ._instrument import traced
 
-from sklearn.decomposition import PCA
-from sklearn.preprocessing import StandardScaler
+
+MODES = [
+    "refit",
+    "incremental",
+    "batched",
+]
+
+SOLVERS = [
+    "eigh",
+    "subspace",
+]
+
+PERIOD_UNITS = {
+    "1d": "D",
+    "1mo": "M",
+}
 
 
 #TODO: Docstring
 
 class PcaEngine:
-    def __init__(self, n_components: int, lookback_window: int):
-        self.pca_model = PCA(n_components=n_components)
+    def __init__(
+            self, n_components: int, lookback_window: int, mode: str = "refit", n_jobs: int = 1,
+            cache: StateCache | None = None, solver: str = "eigh", row_weights: pl.DataFrame | None = None
+            ):
+        if mode not in MODES:
+            raise ValueError(
+                f"Invalid mode '{mode}'. Must be one of these:  {', '.join(MODES)}"
+            )
+        
+        if solver not in SOLVERS:
+            raise ValueError(
+                f"Invalid solver '{solver}'. Must be one of these:  {', '.join(SOLVERS)}"
+            )
+        
+        if solver == "subspace" and mode != "incremental":
+            raise ValueError("The subspace solver is warm-started date by date and requires mode 'incremental'.")
+        
+        self._pca_model = None
         self.n_components = n_components
-        self.scaler = StandardScaler()
+        self._scaler = None
         self.lookback = lookback_window
-        self.states = {}
+        self.mode = mode
+        self.solver = solver
+        self.iterations = {}
+        self.n_jobs = (os.cpu_count() or 1) if n_jobs == -1 else n_jobs
+        self.progress = True
+        self.cache = cache
+        self.states = PcaStates(n_components)
+        self.row_weights = row_weights
+
+        self._block = None
+        self._source = None
+        self.dates = None
+        self.factors = None
+        self.values = None
+        self.weights = None
+
+
+    @property
+    def pca_model(self):
+        """
+        sklearn PCA used by the refit mode, created (and sklearn
+        imported) on first use.
+        """
+
+        if self._pca_model is None:
+            from sklearn.decomposition import PCA
+
+            self._pca_model = PCA(n_components=self.n_components)
+
+        return self._pca_model
+
+
+    @property
+    def scaler(self):
+        if self._scaler is None:
+            from sklearn.preprocessing import StandardScaler
+
+            self._scaler = StandardScaler()
+
+        return self._scaler
+
+
+    def materialize(self, returns: pl.LazyFrame) -> None:
+        """
+        Collect and sort returns once into a contiguous date-indexed
+        matrix. Every fit and transform slices this matrix with
+        searchsorted instead of re-filtering the LazyFrame, so calling
+        again with the same LazyFrame is a no-op.
+        """
+
+        if returns is self._source:
+            return
+
+        frame = returns.sort('date').collect()
+
+        self.dates = frame['date'].to_numpy().astype('datetime64[D]')
+        self.factors = frame.drop('date').columns
+        self.values = np.ascontiguousarray(frame.drop('date').to_numpy(), dtype=np.float64)
+        self.weights = self._align_weights()
+        self._source = returns
+
+
+    def _align_weights(self) -> np.ndarray | None:
+        """
+        Per-row weights for the materialized matrix from row_weights
+        (date, weight), e.g. CalendarMasks.weights. Rows inside a window
+        are counted with their weight; 0 excludes a row without
+        changing the calendar-day window around it. Dates without a
+        weight count fully.
+        """
+
+        if self.row_weights is None:
+            return None
+
+        frame = self.row_weights.sort('date')
+        dates = frame['date'].to_numpy().astype('datetime64[D]')
+        values = frame['weight'].to_numpy().astype(np.float64)
+
+        if (values < 0).any():
+            raise ValueError("Row weights must be non-negative.")
+
+        if self.mode == "refit" and not np.isin(values, [0.0, 1.0]).all():
+            raise ValueError("Fractional row weights require mode 'incremental' or 'batched'; 'refit' can only exclude rows (weight 0).")
+
+        weights = np.ones(len(self.dates))
+        if len(dates):
+            idx = np.searchsorted(dates, self.dates).clip(max=len(dates) - 1)
+            hit = dates[idx] == self.dates
+            weights[hit] = values[idx[hit]]
+
+        return weights
+
+
+    def _row_weights(self, lo: int, hi: int) -> np.ndarray | None:
+        return None if self.weights is None else self.weights[lo:hi]
+
+
+    def _bounds(self, start: dt.date | np.datetime64, end: dt.date | np.datetime64) -> tuple[int, int]:
+        """
+        Row bounds of the half-open date range [start, end) in the
+        materialized matrix.
+        """
+
+        lo = np.searchsorted(self.dates, np.datetime64(start, 'D'), 'left')
+        hi = np.searchsorted(self.dates, np.datetime64(end, 'D'), 'left')
+
+        return int(lo), int(hi)
 
-    
+
+    def _month_starts(self) -> list[dt.date]:
+        """
+        First trading date of every month in the materialized matrix.
+        """
+
+        _, idx = np.unique(self.dates.astype('datetime64[M]'), return_index=True)
+
+        return self.dates[idx].tolist()
+
+
+    @traced("PcaEngine.fit_stretch_for_date")
     def fit_stretch_for_date(
             self, date: dt.date, start_date: dt.date, returns: pl.LazyFrame
             ) -> None:
@@ -27,27 +182,11 @@ class PcaEngine:
         past returns up to that date.
         """
         
-        window = (
-            returns.filter(
-                pl.col('date').is_between(start_date, date, "left")
-            )
-            .sort('date')
-            .drop('date')
-            .collect()
-            .to_numpy()
-        )
-
-        X = self.scaler.fit_transform(window)
-        self.pca_model.fit(X)
-
-        self.states[date] = {
-            "mean": self.scaler.mean_,
-            "scale": self.scaler.scale_,
-            "components": self.pca_model.components_,
-            "explained_var": self.pca_model.explained_variance_ratio_,
-        }
+        self.materialize(returns)
+        self._fit_rows(date, *self._bounds(start_date, date))
 
     #TODO: handle not enough lookback data
+    @traced("PcaEngine.fit_lookback_for_date")
     def fit_lookback_for_date(
             self, date: dt.date, returns: pl.LazyFrame,
             ) -> None:
@@ -58,17 +197,21 @@ class PcaEngine:
         If anchor_pc is provided, sign identification constraint is applied using the anchor_pc
         """
         
-        window = (
-            returns.filter(
-                pl.col('date').is_between(date-dt.timedelta(days=self.lookback), date, "left")
-            )
-            .sort('date')
-            .drop('date')
-            .collect()
-            .to_numpy()
-        )
+        self.materialize(returns)
+        self._fit_rows(date, *self._bounds(date-dt.timedelta(days=self.lookback), date))
+
 
-        X = self.scaler.fit_transform(window)
+    def _fit_rows(self, date: dt.date, lo: int, hi: int) -> None:
+        """
+        Fit the scaler and PCA model on rows [lo, hi) of the
+        materialized matrix and store the state under date.
+        """
+
+        rows = self.values[lo:hi]
+        if self.weights is not None:
+            rows = rows[self.weights[lo:hi] > 0]
+
+        X = self.scaler.fit_transform(rows)
 
         if X.shape[0] < self.n_components:
             print(f"Warning: Not enough data to fit PCA for date {date}. Needed at least {self.n_components} rows, got {X.shape[0]}")
@@ -86,6 +229,296 @@ class PcaEngine:
         }
 
 
+    def _rolling_moments(
+            self, dates: list[dt.date]
+            ) -> Iterator[tuple[dt.date, SlidingMoments]]:
+        """
+        Slide the lookback window over the materialized matrix, yielding
+        the running moments of the window for each date in order.
+        """
+
+        X = self.values
+        moments = SlidingMoments(X.shape[1], shift=np.nanmean(X, axis=0) if X.shape[0] else None)
+        lo = hi = 0
+
+        for date in sorted(dates):
+            new_lo, new_hi = self._bounds(date-dt.timedelta(days=self.lookback), date)
+
+            if new_lo >= hi:
+                moments = SlidingMoments(X.shape[1], shift=moments.shift)
+                moments.add(X[new_lo:new_hi], self._row_weights(new_lo, new_hi))
+            else:
+                moments.remove(X[lo:new_lo], self._row_weights(lo, new_lo))
+                moments.add(X[hi:new_hi], self._row_weights(hi, new_hi))
+            
+            lo, hi = new_lo, new_hi
+
+            yield date, moments
+
+
+    def _expanding_moments(
+            self, dates: list[dt.date], start_date: dt.date
+            ) -> Iterator[tuple[dt.date, CumulativeMoments]]:
+        """
+        Grow the window from start_date over the materialized matrix,
+        folding in only the rows added since the previous date and
+        yielding the cumulative moments for each date in order.
+        """
+
+        moments = CumulativeMoments(self.values.shape[1])
+        hi, _ = self._bounds(start_date, start_date)
+
+        for date in sorted(dates):
+            _, new_hi = self._bounds(start_date, date)
+
+            moments.add(self.values[hi:new_hi], self._row_weights(hi, new_hi))
+            hi = max(hi, new_hi)
+
+            yield date, moments
+
+
+    @traced("PcaEngine.fit_lookback_incremental")
+    def fit_lookback_incremental(
+            self, dates: list[dt.date], returns: pl.LazyFrame
+            ) -> None:
+        """
+        Fit the rolling PCA for every date in dates with one pass over
+        the returns. Running sums and cross-products are updated as
+        days enter and leave the lookback window, so each date only
+        costs an F x F eigendecomposition. States match
+        fit_lookback_for_date up to floating point error.
+        """
+
+        self.materialize(returns)
+        self._fit_incremental(self._rolling_moments(dates), len(dates), "Rolling PCA")
+
+
+    def _fit_incremental(
+            self, windows: Iterator[tuple[dt.date, SlidingMoments | CumulativeMoments]], total: int, desc: str
+            ) -> None:
+
+        from tqdm import tqdm
+
+        # Every fit starts the subspace solver afresh, so its result does
+        # not depend on what this engine fitted before.
+        self._block = None
+
+        for date, moments in tqdm(windows, total=total, desc=desc, disable=not self.progress):
+
+            if moments.n < self.n_components:
+                print(f"Warning: Not enough data to fit PCA for date {date}. Needed at least {self.n_components} rows, got {moments.n}")
+                
+                self.states[date] = None
+                continue
+
+            mean, scale, cov = moments.standardized()
+
+            if self.solver == "subspace":
+                components, explained_var = self._solve_subspace(date, cov)
+            else:
+                components, explained_var = top_components(cov, self.n_components)
+
+            self.states[date] = {
+                "mean": mean,
+                "scale": scale,
+                "components": components,
+                "explained_var": explained_var,
+            }
+
+
+    def _solve_subspace(self, date: dt.date, cov: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Top components of cov by subspace iteration, warm-started from
+        the block of the previous date of the current fit. The first
+        date, and any date where the number of factors changes, is
+        seeded with a full eigendecomposition.
+        """
+
+        if self._block is None or self._block.shape[0] != cov.shape[0]:
+            eigvals, eigvecs = np.linalg.eigh(cov)
+            block_size = min(cov.shape[0], 2 * self.n_components)
+
+            self._block = eigvecs[:, ::-1][:, :block_size]
+            self.iterations[date] = 0
+
+            return top_components(cov, self.n_components)
+
+        components, explained_var, self._block, iterations = subspace_components(cov, self.n_components, self._block)
+        self.iterations[date] = iterations
+
+        return components, explained_var
+
+
+    @traced("PcaEngine.fit_lookback_batched")
+    def fit_lookback_batched(
+            self, dates: list[dt.date], returns: pl.LazyFrame
+            ) -> None:
+        """
+        Fit the rolling PCA for every date in dates by stacking all
+        window covariance matrices into one (T, F, F) array and solving
+        them with a single vectorized eigendecomposition.
+        """
+
+        self.materialize(returns)
+        self._fit_batched(self._rolling_moments(dates))
+
+
+    def _fit_batched(
+            self, windows: Iterator[tuple[dt.date, SlidingMoments | CumulativeMoments]]
+            ) -> None:
+
+        fitted, means, scales, covs = [], [], [], []
+        for date, moments in windows:
+
+            if moments.n < self.n_components:
+                print(f"Warning: Not enough data to fit PCA for date {date}. Needed at least {self.n_components} rows, got {moments.n}")
+                
+                self.states[date] = None
+                continue
+
+            mean, scale, cov = moments.standardized()
+            fitted.append(date)
+            means.append(mean)
+            scales.append(scale)
+            covs.append(cov)
+
+        if not fitted:
+            return
+
+        components, explained_var = top_components_batched(np.stack(covs), self.n_components)
+
+        self.states.assign(fitted, np.stack(means), np.stack(scales), components, explained_var)
+
+
+    @traced("PcaEngine.fit_lookback_dates")
+    def fit_lookback_dates(
+            self, dates: list[dt.date], returns: pl.LazyFrame
+            ) -> None:
+        """
+        Fit the rolling PCA for every date in dates using the engine's
+        mode. With n_jobs > 1 the dates are split across worker
+        processes that read the returns matrix from shared memory.
+        """
+
+        self.materialize(returns)
+
+        if self.n_jobs > 1:
+            fit = lambda: self.states.update(fit_parallel(self, dates, "lookback"))
+        else:
+            fit = lambda: self._fit_lookback_dates(dates)
+
+        self.states.reserve(dates, n_features=self.values.shape[1])
+        self._fit_cached(dates, fit, kind="lookback", lookback=self.lookback)
+
+
+    def _fit_lookback_dates(self, dates: list[dt.date]) -> None:
+
+        if self.mode == "incremental":
+            self._fit_incremental(self._rolling_moments(dates), len(dates), "Rolling PCA")
+        elif self.mode == "batched":
+            self._fit_batched(self._rolling_moments(dates))
+        else:
+            from tqdm import tqdm
+
+            for date in tqdm(dates, desc="Rolling PCA", disable=not self.progress):
+                self._fit_rows(date, *self._bounds(date-dt.timedelta(days=self.lookback), date))
+
+
+    @traced("PcaEngine.fit_stretch_dates")
+    def fit_stretch_dates(
+            self, dates: list[dt.date], start_date: dt.date, returns: pl.LazyFrame
+            ) -> None:
+        """
+        Fit the expanding PCA for every date in dates, using all rows
+        from start_date up to each date. In the incremental and batched
+        modes each date only folds in the rows since the previous date
+        via cumulative moments. With n_jobs > 1 the dates are split
+        across worker processes like fit_lookback_dates.
+        """
+
+        self.materialize(returns)
+
+        if self.n_jobs > 1:
+            fit = lambda: self.states.update(fit_parallel(self, dates, "stretch", start_date=start_date))
+        else:
+            fit = lambda: self._fit_stretch_dates(dates, start_date)
+
+        self.states.reserve(dates, n_features=self.values.shape[1])
+        self._fit_cached(dates, fit, kind="stretch", start_date=start_date)
+
+
+    def _fit_cached(self, dates: list[dt.date], fit: Callable[[], None], **params) -> None:
+        """
+        Run fit unless the states for these dates are already in the
+        engine's StateCache. The cache key covers the materialized
+        returns, the factor names, the fit dates and the engine
+        parameters, so any change to them is a miss.
+        """
+
+        if self.solver == "subspace":
+            fit = self._aligned(dates, fit)
+
+        if self.cache is None:
+            fit()
+            return
+
+        if self.weights is not None:
+            params["weights"] = hashlib.sha256(self.weights.tobytes()).hexdigest()
+
+        key = StateCache.key(self.dates, self.values, self.factors, {
+            "n_components": self.n_components,
+            "mode": self.mode,
+            "solver": self.solver,
+            "dates": sorted(dates),
+            **params,
+        })
+
+        cached = self.cache.load(key)
+        if cached is not None:
+            self.states.update(cached)
+            return
+
+        fit()
+        self.cache.store(key, self.states.select(dates))
+
+
+    def _fit_stretch_dates(self, dates: list[dt.date], start_date: dt.date) -> None:
+
+        if self.mode == "incremental":
+            self._fit_incremental(self._expanding_moments(dates, start_date), len(dates), "Expanding PCA")
+        elif self.mode == "batched":
+            self._fit_batched(self._expanding_moments(dates, start_date))
+        else:
+            from tqdm import tqdm
+
+            for date in tqdm(dates, desc="Expanding PCA", disable=not self.progress):
+                self._fit_rows(date, *self._bounds(start_date, date))
+
+
+    def _aligned(self, dates: list[dt.date], fit: Callable[[], None]) -> Callable[[], None]:
+        """
+        Wrap fit so the new states are aligned in date order afterwards:
+        components are reordered and sign-flipped to match the previous
+        date, which also stitches together chunks fitted by different
+        workers. Reports the subspace iteration counts.
+        """
+
+        def run() -> None:
+            fit()
+
+            rows = self.states.rows(dates)
+            components, explained_var = self.states.components[rows], self.states.explained_var[rows]
+            align_sequence(components, explained_var, self.states.valid[rows])
+            self.states.components[rows], self.states.explained_var[rows] = components, explained_var
+
+            counts = [self.iterations[date] for date in dates if date in self.iterations]
+            if counts:
+                print(f"Subspace solver: {np.mean(counts):.1f} iterations per date on average, {max(counts)} at most")
+
+        return run
+
+
+    @traced("PcaEngine.transform_for_date")
     def transform_for_date(
             self, date: dt.date, returns: pl.LazyFrame
             ) -> np.ndarray:
@@ -99,24 +532,20 @@ class PcaEngine:
         
         state = self.states[date]
 
-        row = (
-            returns.filter(
-                pl.col('date').eq(date)
-            )
-            .drop('date')
-            .collect()
-        )
+        self.materialize(returns)
+        lo, hi = self._bounds(date, date + dt.timedelta(days=1))
 
-        if row.height != 1:
-            raise ValueError(f"Expected exactly one row for date {date}, got {row.height}")
+        if hi - lo != 1:
+            raise ValueError(f"Expected exactly one row for date {date}, got {hi - lo}")
         
-        x = row.to_numpy().reshape(1, -1)
+        x = self.values[lo:hi]
         
         x_scaled = (x-state['mean']) / state['scale']
 
         return x_scaled @ state['components'].T
 
 
+    @traced("PcaEngine.transform_chunk")
     def transform_chunk(
             self, state_date: dt.date, returns_chunk: pl.LazyFrame
             ) -> pl.DataFrame:
@@ -140,144 +569,147 @@ class PcaEngine:
                 f"Expected at least 1 row, got {window.height}"
             )
         
-        X = window.drop('date').to_numpy()
-        
+        return self._project(state, window['date'], window.drop('date').to_numpy())
+
+
+    @traced("PcaEngine.transform_rows")
+    def transform_rows(
+            self, state_date: dt.date, lo: int, hi: int
+            ) -> pl.DataFrame:
+        """
+        Transform rows [lo, hi) of the materialized matrix using the
+        PCA fitted for the specified date. Same output as
+        transform_chunk without collecting a LazyFrame.
+        """
+
+        if state_date not in self.states:
+            raise ValueError(f"No PCA state stored for date {state_date}")
+
+        if hi <= lo:
+            raise ValueError(
+                f"Expected at least 1 row, got {max(hi - lo, 0)}"
+            )
+
+        return self._project(self.states[state_date], self.dates[lo:hi], self.values[lo:hi])
+
+
+    def _project(
+            self, state: dict | None, dates: np.ndarray | pl.Series, X: np.ndarray
+            ) -> pl.DataFrame:
+
+        dates = pl.Series("date", dates, dtype=pl.Date)
+
         if not state:
             pc_cols = {f"pc{i}": pl.Series(name=f"pc{i}", values=[None] * X.shape[0], dtype=pl.Float64)
                        for i in range(self.n_components)}
             
-            return window.select("date").with_columns(**pc_cols)
+            return dates.to_frame().with_columns(**pc_cols)
         
         X_scaled = (X - state["mean"]) / state["scale"]
         PCs = X_scaled @ state["components"].T
 
         pc_cols = {f"pc{i}": PCs[:, i] for i in range(self.n_components)}
 
-        return window.select("date").with_columns(**pc_cols)
+        return dates.to_frame().with_columns(**pc_cols)
 
 
+    @traced("PcaEngine.transform_by_state")
+    def transform_by_state(
+            self, state_dates: list[dt.date], interval: str
+            ) -> pl.DataFrame:
+        """
+        Transform every row of the materialized matrix in one pass. Each
+        row is mapped to the state fitted for its period (the state date
+        in the same month for "1mo", the same day for "1d"), the matching
+        mean, scale and components are gathered, and all PC returns are
+        computed with one einsum. Rows without a state in state_dates are
+        dropped; rows whose state could not be fitted get null PCs.
+
+        Returns a single DataFrame with date, pc0..pc{k-1} and state
+        columns, sorted by date.
+        """
+
+        if interval not in PERIOD_UNITS:
+            raise ValueError(
+                f"Invalid interval '{interval}'. Must be one of these:  {', '.join(PERIOD_UNITS)}"
+            )
+
+        unit = PERIOD_UNITS[interval]
+        state_dates = np.unique(np.asarray(state_dates, dtype='datetime64[D]'))
+
+        for date in state_dates.tolist():
+            if date not in self.states:
+                raise ValueError(f"No PCA state stored for date {date}")
+
+        state_keys = state_dates.astype(f'datetime64[{unit}]')
+        row_keys = self.dates.astype(f'datetime64[{unit}]')
+
+        idx = np.searchsorted(state_keys, row_keys).clip(max=max(len(state_keys) - 1, 0))
+        rows = np.flatnonzero(state_keys[idx] == row_keys) if len(state_keys) else np.array([], dtype=int)
+
+        srows = self.states.rows(state_dates)[idx[rows]]
+        valid = self.states.valid[srows]
+
+        X_scaled = (self.values[rows] - self.states.mean[srows]) / self.states.scale[srows]
+        PCs = np.einsum('nf,nkf->nk', X_scaled, self.states.components[srows])
+
+        return (pl.DataFrame({
+            "date": self.dates[rows],
+            **{f"pc{i}": PCs[:, i] for i in range(self.n_components)},
+            "state": state_dates[idx[rows]],
+        })
+        .with_columns(
+            pl.when(pl.Series(valid)).then(pl.col(f"pc{i}")).alias(f"pc{i}")
+            for i in range(self.n_components)
+        )
+        )
+
+
+    @traced("PcaEngine.fit_transform_rolling_monthly")
     def fit_transform_rolling_monthly(
             self, returns: pl.LazyFrame
     ) -> pl.DataFrame:
         
-        returns_monthly = (
-            returns
-            .with_columns(pl.col('date').dt.truncate('1mo').alias('month'))
-            .group_by('month')
-            .agg(pl.col('date').first())
-            .sort('date')
-        )
-
-        dates = (
-            returns_monthly
-            .drop('month')
-            .collect()
-        )['date'].to_list()
+        self.materialize(returns)
+        dates = self._month_starts()
 
 
         print("Fitting rolling PCA...")
-        for date in tqdm(dates[1:], desc="Rolling PCA"):
-            self.fit_lookback_for_date(date, returns)
+        self.fit_lookback_dates(dates[1:], returns)
         
         print("Transforming rolling PCA...")
-        pcs = []
-        for date in tqdm(dates[1:], desc="Rolling PCA"):            
-            
-            chunk = (
-                returns
-                .with_columns(pl.col('date').dt.truncate('1mo').alias('month'))
-                .filter(pl.col('month').eq(date.replace(day=1)))
-                .drop('month')
-                .sort('date')
-            )
-            
-            pcs.append(
-                self.transform_chunk(date, chunk)
-                .with_columns(
-                    pl.lit(date).alias('state')
-                )
-            )
-        
-        return pl.concat(pcs, how="vertical")
+        return self.transform_by_state(dates[1:], "1mo")
 
 
+    @traced("PcaEngine.fit_transform_expanding_monthly")
     def fit_transform_expanding_monthly(
                 self, start_date: dt.date, returns: pl.LazyFrame
         ) -> pl.DataFrame:
             
-            returns_monthly = (
-                returns
-                .with_columns(pl.col('date').dt.truncate('1mo').alias('month'))
-                .group_by('month')
-                .agg(pl.col('date').first())
-                .sort('date')
-            )
-
-            dates = (
-                returns_monthly
-                .drop('month')
-                .collect()
-            )['date'].to_list()
+            self.materialize(returns)
+            dates = self._month_starts()
 
 
             print("Fitting expanding PCA...")
-            for date in tqdm(dates[1:], desc="Expanding PCA"):
-                self.fit_stretch_for_date(date, start_date, returns)
+            self.fit_stretch_dates(dates[1:], start_date, returns)
             
             print("Transforming expanding PCA...")
-            pcs = []
-            for date in tqdm(dates[1:], desc="Expanding PCA"):            
-                
-                chunk = (
-                    returns
-                    .with_columns(pl.col('date').dt.truncate('1mo').alias('month'))
-                    .filter(pl.col('month').eq(date.replace(day=1)))
-                    .drop('month')
-                    .sort('date')
-                )
-                
-                pcs.append(
-                    self.transform_chunk(date, chunk)
-                    .with_columns(
-                        pl.lit(date).alias('state')
-                    )
-                )
-            
-            return pl.concat(pcs, how="vertical")
+            return self.transform_by_state(dates[1:], "1mo")
 
 
+    @traced("PcaEngine.fit_transform_rolling_daily")
     def fit_transform_rolling_daily(
             self, returns: pl.LazyFrame
     ) -> pl.DataFrame:
         
-        dates = (
-            returns
-            .select(pl.col('date').unique().sort())
-            .collect()
-        )['date'].to_list()
+        self.materialize(returns)
+        dates = np.unique(self.dates).tolist()
 
         print("Fitting rolling PCA...")
-        for date in tqdm(dates[1:], desc="Rolling PCA"):
-            self.fit_lookback_for_date(date, returns)
+        self.fit_lookback_dates(dates[1:], returns)
         
         print("Transforming rolling PCA...")
-        pcs = []
-        for date in tqdm(dates[1:], desc="Rolling PCA"):            
-            
-            chunk = (
-                returns
-                .filter(pl.col('date').eq(date))
-                .sort('date')
-            )
-            
-            pcs.append(
-                self.transform_chunk(date, chunk)
-                .with_columns(
-                    pl.lit(date).alias('state')
-                )
-            )
-        
-        return pl.concat(pcs, how="vertical")
+        return self.transform_by_state(dates[1:], "1d")
 
 
     def inverse_transform_chunk(
@@ -1,18 +1,60 @@
 from .factor_momentum_signal import FactorMomentumSignal
 from .PCA import PcaEngine
-from ._wrappers import assetspace_signal_monthly, factorspace_signals_monthly
+from ._pca_states import PcaStates
+from ._state_cache import StateCache
+from ._calendar_masks import CalendarMasks
+from ._wrappers import assetspace_signal_monthly, factorspace_signals_monthly, alpha_monthly_by_type, alpha_monthly_checkpointed, alpha_daily, iter_alpha_daily
+from ._checkpoints import Checkpoints
 from ._factor_signal_construction import construct_factor_signal_monthly
-from ._map_signal_to_assets import construct_asset_signal_monthly
-from ._constants import FACTORS, TMP
+from ._map_signal_to_assets import construct_asset_signal_monthly, scan_asset_signal_daily
+from ._loaders import scan_assets, scan_exposures, scan_factors
+from ._providers import DataProvider, SfQuantProvider, ArrowProvider, export_arrow, get_provider, set_provider
+from ._instrument import enable_tracing, disable_tracing, span, traced, trace_summary
+from ._constants import get_factors, get_tmp
 
 
 __all__ = [
     "FactorMomentumSignal",
     "PcaEngine",
+    "PcaStates",
+    "StateCache",
+    "CalendarMasks",
     "assetspace_signal_monthly",
     "factorspace_signals_monthly",
+    "alpha_monthly_by_type",
+    "alpha_monthly_checkpointed",
+    "alpha_daily",
+    "iter_alpha_daily",
+    "Checkpoints",
     "construct_factor_signal_monthly", 
     "construct_asset_signal_monthly", 
+    "scan_asset_signal_daily",
+    "scan_assets",
+    "scan_exposures",
+    "scan_factors",
+    "DataProvider",
+    "SfQuantProvider",
+    "ArrowProvider",
+    "export_arrow",
+    "get_provider",
+    "set_provider",
+    "enable_tracing",
+    "disable_tracing",
+    "span",
+    "traced",
+    "trace_summary",
+    "get_factors",
+    "get_tmp",
     "FACTORS",
     "TMP"
     ]
+
+
+def __getattr__(name: str):
+    # FACTORS and TMP are resolved on first access; see _constants.
+    if name == "FACTORS":
+        return get_factors()
+    if name == "TMP":
+        return get_tmp()
+
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,83 @@
+"""
+Command-line tools for factor_momentum.
+
+    python -m factor_momentum checkpoints list [--stage S]
+    python -m factor_momentum checkpoints show KEY
+    python -m factor_momentum checkpoints gc [--older-than DAYS] [--max-gb GB] [--stage S] [--dry-run]
+
+--root defaults to TMP/fm_checkpoints.
+"""
+
+import argparse
+import json
+
+import polars as pl
+
+from ._checkpoints import Checkpoints
+
+
+def _checkpoints(args: argparse.Namespace) -> None:
+    store = Checkpoints(args.root) if args.root else Checkpoints.default()
+
+    if args.command == "list":
+        entries = store.entries()
+        if args.stage:
+            entries = entries.filter(pl.col('stage') == args.stage)
+
+        with pl.Config(tbl_rows=-1, tbl_width_chars=200, fmt_str_lengths=80):
+            print(entries.with_columns(pl.col('key').str.slice(0, 12)))
+        print(f"{entries.height} checkpoints, {entries['bytes'].sum() / 2**20:.1f} MB")
+
+    elif args.command == "show":
+        info = store.info(args.key)
+        print(json.dumps(info, indent=2, default=str))
+
+        with pl.Config(tbl_width_chars=200):
+            print(pl.read_parquet(store._path(info["key"]), n_rows=args.rows))
+
+    elif args.command == "gc":
+        if args.older_than is None and args.max_gb is None:
+            raise SystemExit("gc needs --older-than and/or --max-gb.")
+
+        removed = store.gc(
+            older_than_days=args.older_than,
+            max_bytes=None if args.max_gb is None else int(args.max_gb * 2**30),
+            stage=args.stage,
+            dry_run=args.dry_run,
+        )
+        verb = "Would remove" if args.dry_run else "Removed"
+        print(f"{verb} {len(removed)} checkpoints.")
+        for key in removed:
+            print(f"  {key}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m factor_momentum", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    tools = parser.add_subparsers(dest="tool", required=True)
+
+    checkpoints = tools.add_parser("checkpoints", help="list, inspect and garbage-collect stage checkpoints")
+    checkpoints.add_argument("--root", default=None, help="checkpoint directory (default: TMP/fm_checkpoints)")
+    commands = checkpoints.add_subparsers(dest="command", required=True)
+
+    ls = commands.add_parser("list")
+    ls.add_argument("--stage", default=None)
+
+    show = commands.add_parser("show")
+    show.add_argument("key", help="checkpoint key or a unique prefix of it")
+    show.add_argument("--rows", type=int, default=10)
+
+    gc = commands.add_parser("gc")
+    gc.add_argument("--older-than", type=float, default=None, help="remove checkpoints unused for this many days")
+    gc.add_argument("--max-gb", type=float, default=None, help="then remove the least recently used until within this size")
+    gc.add_argument("--stage", default=None)
+    gc.add_argument("--dry-run", action="store_true")
+
+    args = parser.parse_args()
+
+    if args.tool == "checkpoints":
+        _checkpoints(args)
+
+
+if __name__ == "__main__":
+    main()
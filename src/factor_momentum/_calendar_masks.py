@@ -0,0 +1,129 @@
+import datetime as dt
+
+import numpy as np
+import polars as pl
+
+
+class CalendarMasks:
+    """
+    Registry of named date masks over a trading calendar.
+
+    Each mask is stored bit-packed (one bit per trading date, via
+    np.packbits), so many rules over a long daily history stay small.
+    Masks are combined with bitwise AND/OR on the packed bytes, and the
+    result can be turned into per-date row weights for PcaEngine, which
+    applies them inside each window instead of dropping rows up front:
+
+        masks = CalendarMasks(dates)
+        masks.register_expr("earnings_season", earnings_season_expr())
+        masks.register_dates("fomc", fomc_dates)
+        engine = PcaEngine(..., row_weights=masks.weights(masks.any_of("earnings_season", "fomc")))
+    """
+
+    def __init__(self, dates: list[dt.date] | np.ndarray | pl.Series):
+        self.dates = np.unique(np.asarray(dates, dtype='datetime64[D]'))
+        self._bits = {}
+
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._bits
+
+
+    @property
+    def names(self) -> list[str]:
+        return list(self._bits)
+
+
+    def register(self, name: str, mask: np.ndarray) -> None:
+        """
+        Store a boolean mask aligned with self.dates under name.
+        """
+
+        mask = np.asarray(mask, dtype=bool)
+        if mask.shape != self.dates.shape:
+            raise ValueError(f"Mask '{name}' has {mask.shape[0]} entries, expected {self.dates.shape[0]}.")
+
+        self._bits[name] = np.packbits(mask)
+
+
+    def register_dates(self, name: str, dates: list[dt.date] | np.ndarray) -> None:
+        """
+        Mask that is set on the given dates (e.g. FOMC announcements or
+        any user-supplied list). Dates off the calendar are ignored.
+        """
+
+        self.register(name, np.isin(self.dates, np.asarray(dates, dtype='datetime64[D]')))
+
+
+    def register_expr(self, name: str, expr: pl.Expr) -> None:
+        """
+        Mask from a boolean polars expression over a 'date' column.
+        """
+
+        mask = pl.DataFrame({"date": self.dates}).select(expr).to_series()
+
+        self.register(name, mask.fill_null(False).to_numpy())
+
+
+    def register_month_ends(self, name: str = "month_end") -> None:
+        """
+        Mask of the last trading date of every month.
+        """
+
+        months = self.dates.astype('datetime64[M]')
+        last = np.ones(len(months), dtype=bool)
+        last[:-1] = months[1:] != months[:-1]
+
+        self.register(name, last)
+
+
+    def get(self, name: str) -> np.ndarray:
+        if name not in self._bits:
+            raise ValueError(
+                f"Unknown mask '{name}'. Must be one of these:  {', '.join(self._bits)}"
+            )
+
+        return np.unpackbits(self._bits[name], count=len(self.dates)).astype(bool)
+
+
+    def _combine(self, names: tuple[str, ...], op: np.ufunc) -> np.ndarray:
+        if not names:
+            raise ValueError("At least one mask name is required.")
+
+        for name in names:
+            if name not in self._bits:
+                raise ValueError(
+                    f"Unknown mask '{name}'. Must be one of these:  {', '.join(self._bits)}"
+                )
+
+        packed = op.reduce([self._bits[name] for name in names])
+
+        return np.unpackbits(packed, count=len(self.dates)).astype(bool)
+
+
+    def all_of(self, *names: str) -> np.ndarray:
+        """
+        Dates set in every named mask.
+        """
+
+        return self._combine(names, np.bitwise_and)
+
+
+    def any_of(self, *names: str) -> np.ndarray:
+        """
+        Dates set in at least one named mask.
+        """
+
+        return self._combine(names, np.bitwise_or)
+
+
+    def weights(self, mask: np.ndarray, weight: float = 0.0) -> pl.DataFrame:
+        """
+        Row weights for PcaEngine: weight on the masked dates (0 excludes
+        them from every window), 1 everywhere else.
+        """
+
+        return pl.DataFrame({
+            "date": self.dates,
+            "weight": np.where(np.asarray(mask, dtype=bool), weight, 1.0),
+        })
@@ -0,0 +1,259 @@
+import datetime as dt
+import hashlib
+import json
+import os
+import time
+from typing import Callable
+
+import polars as pl
+
+from ._constants import get_tmp
+
+
+class Checkpoint:
+    """
+    One pipeline stage's output in a Checkpoints store. The key is known
+    up front (it depends only on the stage, its parameters and the keys
+    of its inputs), so a hit further down the pipeline never touches
+    the stages above it. load() reads the stored frame, or computes and
+    stores it on a miss.
+    """
+
+    __slots__ = ("store", "key", "stage", "params", "inputs", "_compute", "_frame")
+
+    def __init__(
+            self, store: "Checkpoints", key: str, stage: str, params: dict,
+            inputs: list[str], compute: Callable[[], pl.DataFrame]
+    ):
+        self.store = store
+        self.key = key
+        self.stage = stage
+        self.params = params
+        self.inputs = inputs
+        self._compute = compute
+        self._frame = None
+
+
+    def exists(self) -> bool:
+        return os.path.exists(self.store._path(self.key))
+
+
+    def load(self) -> pl.DataFrame:
+        if self._frame is None:
+            self._frame = self.store.read(self.key)
+
+        if self._frame is None:
+            self._frame = self._compute()
+            self.store.write(self, self._frame)
+
+        return self._frame
+
+
+class Checkpoints:
+    """
+    Content-addressed Parquet store of pipeline stage outputs.
+
+    Each entry is root/{key}.parquet plus root/{key}.json holding the
+    stage name, parameters, input keys, row count and creation time. The
+    key is a sha256 of the stage name, its parameters and the keys of
+    the stages it was computed from, so changing a parameter changes the
+    key of that stage and of everything downstream of it, while the
+    stages above are still hits. Reads touch the entry, so gc can evict
+    the least recently used entries first.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+
+    @classmethod
+    def default(cls) -> "Checkpoints":
+        """
+        The store under TMP/fm_checkpoints.
+        """
+
+        tmp = get_tmp()
+        if tmp is None:
+            raise ValueError("No checkpoint root given and TMP is not set.")
+
+        return cls(os.path.join(tmp, "fm_checkpoints"))
+
+
+    @staticmethod
+    def key(stage: str, params: dict, inputs: list[str]) -> str:
+        payload = json.dumps({"stage": stage, "params": params, "inputs": inputs}, sort_keys=True, default=str)
+
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+
+    def _path(self, key: str, ext: str = "parquet") -> str:
+        return os.path.join(self.root, f"{key}.{ext}")
+
+
+    def stage(
+            self, stage: str, params: dict, inputs: list[Checkpoint],
+            compute: Callable[[], pl.DataFrame]
+    ) -> Checkpoint:
+        """
+        Handle for stage computed by compute() from inputs with params.
+        Nothing is read or computed until load() is called.
+        """
+
+        keys = [c.key for c in inputs]
+
+        return Checkpoint(self, self.key(stage, params, keys), stage, params, keys, compute)
+
+
+    def read(self, key: str) -> pl.DataFrame | None:
+        path = self._path(key)
+        if not os.path.exists(path):
+            return None
+
+        frame = pl.read_parquet(path)
+        os.utime(path)
+
+        return frame
+
+
+    def write(self, checkpoint: Checkpoint, frame: pl.DataFrame) -> None:
+        path = self._path(checkpoint.key)
+        meta = {
+            "key": checkpoint.key,
+            "stage": checkpoint.stage,
+            "params": checkpoint.params,
+            "inputs": checkpoint.inputs,
+            "rows": frame.height,
+            "created": dt.datetime.now().isoformat(timespec="seconds"),
+        }
+
+        # Both files are swapped in whole. An entry exists once its
+        # Parquet file does; the metadata is informational only.
+        tmp = f"{path}.tmp-{os.getpid()}"
+        frame.write_parquet(tmp)
+        os.replace(tmp, path)
+
+        with open(f"{tmp}.json", "w") as f:
+            json.dump(meta, f, indent=2, default=str)
+        os.replace(f"{tmp}.json", self._path(checkpoint.key, "json"))
+
+
+    def info(self, key: str) -> dict:
+        """
+        Metadata of the entry key (a unique prefix is enough), with its
+        size, last access time and schema.
+        """
+
+        matches = [name[:-8] for name in os.listdir(self.root) if name.endswith(".parquet") and name.startswith(key)]
+        if len(matches) != 1:
+            raise ValueError(f"{len(matches)} checkpoints match '{key}'.")
+
+        key = matches[0]
+        path = self._path(key)
+
+        meta = {"key": key}
+        if os.path.exists(self._path(key, "json")):
+            with open(self._path(key, "json")) as f:
+                meta = json.load(f)
+
+        stat = os.stat(path)
+
+        return {
+            **meta,
+            "bytes": stat.st_size,
+            "accessed": dt.datetime.fromtimestamp(stat.st_mtime).isoformat(timespec="seconds"),
+            "schema": {name: str(dtype) for name, dtype in pl.read_parquet_schema(path).items()},
+        }
+
+
+    def entries(self) -> pl.DataFrame:
+        """
+        One row per stored checkpoint, most recently used first.
+        """
+
+        rows = []
+        for name in os.listdir(self.root):
+            if not name.endswith(".parquet"):
+                continue
+
+            key = name[:-8]
+            meta = {}
+            if os.path.exists(self._path(key, "json")):
+                with open(self._path(key, "json")) as f:
+                    meta = json.load(f)
+
+            stat = os.stat(self._path(key))
+            rows.append({
+                "key": key,
+                "stage": meta.get("stage"),
+                "rows": meta.get("rows"),
+                "bytes": stat.st_size,
+                "created": meta.get("created"),
+                "accessed": dt.datetime.fromtimestamp(stat.st_mtime),
+                "params": json.dumps(meta.get("params"), sort_keys=True, default=str),
+            })
+
+        schema = {
+            "key": pl.String, "stage": pl.String, "rows": pl.Int64, "bytes": pl.Int64,
+            "created": pl.String, "accessed": pl.Datetime("us"), "params": pl.String,
+        }
+
+        return pl.DataFrame(rows, schema=schema).sort('accessed', descending=True)
+
+
+    def gc(
+            self, older_than_days: float | None = None, max_bytes: int | None = None,
+            stage: str | None = None, dry_run: bool = False
+    ) -> list[str]:
+        """
+        Delete checkpoints and return their keys: those not used for
+        older_than_days, then the least recently used until the store
+        is within max_bytes. stage restricts both to one stage. Metadata
+        without data and day-old temporary files are always removed.
+        """
+
+        entries = self.entries().sort('accessed')
+        if stage is not None:
+            entries = entries.filter(pl.col('stage') == stage)
+
+        doomed = []
+        if older_than_days is not None:
+            cutoff = dt.datetime.fromtimestamp(time.time() - older_than_days * 86400)
+            doomed += entries.filter(pl.col('accessed') < cutoff)['key'].to_list()
+
+        if max_bytes is not None:
+            sizes = dict(entries.select('key', 'bytes').iter_rows())
+            total = self.entries()['bytes'].sum() - sum(sizes[key] for key in doomed)
+            for key, size in sizes.items():
+                if total <= max_bytes:
+                    break
+                if key in doomed:
+                    continue
+
+                doomed.append(key)
+                total -= size
+
+        if dry_run:
+            return doomed
+
+        for key in doomed:
+            for ext in ["parquet", "json"]:
+                if os.path.exists(self._path(key, ext)):
+                    os.remove(self._path(key, ext))
+
+        # Temporary files younger than a day may belong to a running write.
+        for name in os.listdir(self.root):
+            path = os.path.join(self.root, name)
+            stray = (
+                (".tmp-" in name and os.stat(path).st_mtime < time.time() - 86400)
+                or (name.endswith(".json") and ".tmp-" not in name and not os.path.exists(self._path(name[:-5])))
+            )
+            if stray:
+                os.remove(path)
+
+        return doomed
+
+
+    def clear(self) -> None:
+        for name in os.listdir(self.root):
+            os.remove(os.path.join(self.root, name))
@@ -1,24 +1,59 @@
-from sf_quant.data.factors import get_factor_names
-
-from dotenv import load_dotenv
+import functools
 import os
 
-load_dotenv()
-
-TMP = os.getenv("TMP")
-
 DROPPED_FACTORS = [
     "USSLOWL_RESVOL",
     "USSLOWL_MOMENTUM",
     "USSLOWL_BETA",
 ]
 
-FACTORS = [fac for fac in get_factor_names('style')
-            #if fac not in DROPPED_FACTORS
-            ]
-
 TYPES = [
     "1m cross-section",
     "12m time-series continuous",
     "12m time-series discrete",
-]
\ No newline at end of file
+]
+
+# Months of monthly factor returns needed before the first month being
+# computed: one for lag_ret, plus the 11-month rolling sum of the
+# shifted lag_ret for the time-series signals.
+LOOKBACK_MONTHS = {
+    "1m cross-section": 1,
+    "12m time-series continuous": 13,
+    "12m time-series discrete": 13,
+}
+
+
+# FACTORS and TMP are resolved on first use and cached, so importing the
+# package neither reads .env nor queries the data layer. The module
+# attributes still work through __getattr__.
+
+@functools.cache
+def load_env() -> None:
+    from dotenv import load_dotenv
+
+    load_dotenv()
+
+
+@functools.cache
+def get_tmp() -> str | None:
+    load_env()
+
+    return os.getenv("TMP")
+
+
+@functools.cache
+def get_factors() -> list[str]:
+    from ._providers import get_provider
+
+    return [fac for fac in get_provider().factor_names('style')
+            #if fac not in DROPPED_FACTORS
+            ]
+
+
+def __getattr__(name: str):
+    if name == "FACTORS":
+        return get_factors()
+    if name == "TMP":
+        return get_tmp()
+
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
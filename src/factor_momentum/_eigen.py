@@ -0,0 +1,116 @@
+import numpy as np
+
+
+def _flip_signs(components: np.ndarray) -> np.ndarray:
+    """
+    Make the largest-magnitude loading of each component positive,
+    matching the sign convention sklearn's PCA applies to components_.
+    """
+
+    idx = np.abs(components).argmax(axis=-1)
+    signs = np.sign(np.take_along_axis(components, idx[..., None], axis=-1))
+    signs[signs == 0] = 1.0
+
+    return components * signs
+
+
+def top_components_batched(covs: np.ndarray, n_components: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Leading eigenvectors of a (T, F, F) stack of symmetric covariance
+    matrices, solved with one vectorized eigh call. Returns
+    (components, explained_variance_ratio) with shapes (T, k, F) and
+    (T, k), each date laid out like sklearn's PCA.
+    """
+
+    eigvals, eigvecs = np.linalg.eigh(covs)
+
+    eigvals = eigvals[:, ::-1][:, :n_components]
+    components = eigvecs[:, :, ::-1][:, :, :n_components].transpose(0, 2, 1)
+    total = np.trace(covs, axis1=1, axis2=2)
+
+    return _flip_signs(components), eigvals / total[:, None]
+
+
+def top_components(cov: np.ndarray, n_components: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Leading eigenvectors of a single F x F covariance matrix, returned
+    as (components, explained_variance_ratio) in the same layout as
+    sklearn's PCA (components are rows, largest first).
+    """
+
+    components, explained_var = top_components_batched(cov[None], n_components)
+
+    return components[0], explained_var[0]
+
+
+def subspace_components(
+        cov: np.ndarray, n_components: int, start: np.ndarray, tol: float = 1e-8, max_iter: int = 200
+        ) -> tuple[np.ndarray, np.ndarray, np.ndarray, int]:
+    """
+    Leading eigenvectors of cov by block subspace iteration with a
+    Rayleigh-Ritz step, warm-started from the (F, p) block start
+    (p >= n_components, typically the previous date's block). Adjacent
+    rolling windows barely differ, so a warm start usually converges in
+    a handful of iterations.
+
+    Returns (components, explained_variance_ratio, block, iterations),
+    where block is the converged (F, p) basis to warm-start the next
+    date with.
+    """
+
+    V, _ = np.linalg.qr(start)
+    scale = max(abs(np.trace(cov)), np.finfo(float).tiny)
+
+    for iteration in range(1, max_iter + 1):
+        Q, _ = np.linalg.qr(cov @ V)
+        eigvals, U = np.linalg.eigh(Q.T @ cov @ Q)
+        eigvals, V = eigvals[::-1], Q @ U[:, ::-1]
+
+        top = V[:, :n_components]
+        residual = cov @ top - top * eigvals[:n_components]
+
+        if np.linalg.norm(residual) <= tol * scale:
+            break
+
+    return V[:, :n_components].T, eigvals[:n_components] / np.trace(cov), V, iteration
+
+
+def align_components(
+        components: np.ndarray, explained_var: np.ndarray, previous: np.ndarray
+        ) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Reorder and sign-flip components so each one matches the component
+    of previous it overlaps most with. Keeps PC labels and signs
+    continuous across dates when eigenvalues cross or eigenvectors come
+    back with an arbitrary sign.
+    """
+
+    k = components.shape[0]
+    overlap = np.abs(components @ previous.T)
+
+    order = np.zeros(k, dtype=int)
+    for _ in range(k):
+        i, j = np.unravel_index(np.argmax(overlap), overlap.shape)
+        order[j] = i
+        overlap[i, :] = -1.0
+        overlap[:, j] = -1.0
+
+    components, explained_var = components[order], explained_var[order]
+
+    signs = np.sign(np.sum(components * previous, axis=1))
+    signs[signs == 0] = 1.0
+
+    return components * signs[:, None], explained_var
+
+
+def align_sequence(components: np.ndarray, explained_var: np.ndarray, valid: np.ndarray) -> None:
+    """
+    Align a (T, k, F) history of components in place, each valid date
+    against the last valid date before it.
+    """
+
+    previous = None
+    for t in np.flatnonzero(valid):
+        if previous is not None:
+            components[t], explained_var[t] = align_components(components[t], explained_var[t], previous)
+        previous = components[t]
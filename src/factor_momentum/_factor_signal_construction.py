@@ -2,13 +2,26 @@ import polars as pl
 import numpy as np
 
 from ._constants import TYPES
+from ._instrument import traced
 
 #TODO: require columns for each df, docstring
 
+@traced("construct_factor_signal_monthly")
 def construct_factor_signal_monthly (
         monthly_factor_returns: pl.LazyFrame, type: str 
 ) -> pl.DataFrame:
 
+    return scan_factor_signal_monthly(monthly_factor_returns, type).collect()
+
+
+def scan_factor_signal_monthly (
+        monthly_factor_returns: pl.LazyFrame, type: str
+) -> pl.LazyFrame:
+    """
+    Lazy version of construct_factor_signal_monthly, for callers that
+    keep composing the query before collecting it.
+    """
+
     if type not in TYPES:
             raise ValueError(
                 f"Invalid type '{type}'. Must be one of these:  {', '.join(TYPES)}"
@@ -28,7 +41,6 @@ def construct_factor_signal_monthly (
             .otherwise(0)
             .alias('signal')
         )
-        .collect()
         )
     
     elif type == "12m time-series continuous":
@@ -40,7 +52,6 @@ def construct_factor_signal_monthly (
             .alias('signal')
         )
         .drop_nulls()
-        .collect()
         )
     
     elif type == "12m time-series discrete":
@@ -55,7 +66,6 @@ def construct_factor_signal_monthly (
             (pl.col('signal') / pl.col('signal').abs()).alias('signal')
         )
         .drop_nulls()
-        .collect()
         )
     
     else:
@@ -0,0 +1,191 @@
+import atexit
+import functools
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Callable, Iterator
+
+import polars as pl
+
+
+TRACE_ENV = "FM_TRACE"
+
+_state = {
+    "enabled": False,
+    "sink": None,
+    "stack": [],
+    "records": [],
+    "atexit": False,
+}
+
+
+class Span:
+    """
+    Measurements of one pipeline stage. Set rows inside the block if
+    the stage knows how many rows it produced.
+    """
+
+    __slots__ = ("name", "attrs", "rows")
+
+    def __init__(self, name: str, attrs: dict):
+        self.name = name
+        self.attrs = attrs
+        self.rows = None
+
+
+def _peak_rss_mb() -> float | None:
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS; the
+    # resource module does not exist on Windows.
+    try:
+        import resource
+    except ImportError:
+        return None
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    return peak / 2**20 if sys.platform == "darwin" else peak / 2**10
+
+
+def enable_tracing(path: str | None = None) -> None:
+    """
+    Start recording spans. Each finished span is written as one JSON
+    line to path (appended), or to stderr when path is None or "-".
+    A summary table is printed to stderr at exit.
+    """
+
+    if _state["sink"] not in (None, sys.stderr):
+        _state["sink"].close()
+
+    _state["sink"] = sys.stderr if path in (None, "-", "1") else open(path, "a", buffering=1)
+    _state["enabled"] = True
+
+    if not _state["atexit"]:
+        atexit.register(_print_summary)
+        _state["atexit"] = True
+
+
+def disable_tracing() -> None:
+    if _state["sink"] not in (None, sys.stderr):
+        _state["sink"].close()
+
+    _state["sink"] = None
+    _state["enabled"] = False
+
+
+@contextmanager
+def _span(name: str, attrs: dict) -> Iterator[Span]:
+    span = Span(name, attrs)
+    parent = _state["stack"][-1].name if _state["stack"] else None
+    _state["stack"].append(span)
+
+    rss0 = _peak_rss_mb()
+    cpu0 = time.process_time()
+    wall0 = time.perf_counter()
+    try:
+        yield span
+    finally:
+        wall = time.perf_counter() - wall0
+        cpu = time.process_time() - cpu0
+        rss = _peak_rss_mb()
+        _state["stack"].pop()
+
+        record = {
+            "span": name,
+            "parent": parent,
+            "depth": len(_state["stack"]),
+            "wall_s": wall,
+            "cpu_s": cpu,
+            "peak_rss_mb": rss,
+            "rss_growth_mb": None if rss is None else rss - rss0,
+            "rows": span.rows,
+            **span.attrs,
+        }
+        _state["records"].append(record)
+
+        if _state["sink"] is not None:
+            _state["sink"].write(json.dumps(record, default=str) + "\n")
+
+
+def span(name: str, **attrs):
+    """
+    Context manager timing a stage (wall time, CPU time, peak RSS and
+    optional row count). A shared no-op context when tracing is off.
+    """
+
+    if not _state["enabled"]:
+        return nullcontext(Span(name, attrs))
+
+    return _span(name, attrs)
+
+
+def _count_rows(result) -> int | None:
+    if isinstance(result, (pl.DataFrame, pl.Series)):
+        return len(result)
+    if isinstance(result, tuple) and result and isinstance(result[0], pl.DataFrame):
+        return result[0].height
+
+    return None
+
+
+def traced(name: str, rows: Callable[[object], int | None] = _count_rows):
+    """
+    Decorator version of span. Row counts are taken from the result
+    (DataFrame height by default). When tracing is off the wrapper only
+    checks a flag before calling through.
+    """
+
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _state["enabled"]:
+                return fn(*args, **kwargs)
+
+            with _span(name, {}) as s:
+                result = fn(*args, **kwargs)
+                s.rows = rows(result)
+
+            return result
+
+        return wrapper
+
+    return decorate
+
+
+def trace_summary() -> pl.DataFrame:
+    """
+    Totals per span name over everything recorded in this process.
+    """
+
+    if not _state["records"]:
+        return pl.DataFrame(schema={
+            "span": pl.String, "calls": pl.UInt32, "wall_s": pl.Float64, "cpu_s": pl.Float64,
+            "peak_rss_mb": pl.Float64, "rows": pl.Int64,
+        })
+
+    return (pl.DataFrame(
+        [{k: r[k] for k in ["span", "wall_s", "cpu_s", "peak_rss_mb", "rows"]} for r in _state["records"]],
+        schema_overrides={"peak_rss_mb": pl.Float64, "rows": pl.Int64},
+    )
+    .group_by('span', maintain_order=True).agg(
+        pl.len().alias('calls'),
+        pl.col('wall_s').sum(),
+        pl.col('cpu_s').sum(),
+        pl.col('peak_rss_mb').max(),
+        pl.col('rows').sum(),
+    )
+    .sort('wall_s', descending=True)
+    )
+
+
+def _print_summary() -> None:
+    if not _state["records"]:
+        return
+
+    with pl.Config(tbl_rows=-1, tbl_width_chars=120, fmt_str_lengths=60):
+        print(trace_summary(), file=sys.stderr)
+
+
+if os.getenv(TRACE_ENV):
+    enable_tracing(os.getenv(TRACE_ENV))
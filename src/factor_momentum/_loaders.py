@@ -1,44 +1,303 @@
 import polars as pl
 import datetime as dt
 import numpy as np
-
-from sf_quant.data.exposures import load_exposures
-from sf_quant.data.assets import load_assets
-from sf_quant.data.factors import load_factors
+import json
+import os
+from typing import Callable
 
 from .PCA import PcaEngine
-from ._constants import FACTORS
+from ._constants import get_factors, get_tmp
+from ._providers import get_provider
+from ._instrument import traced
 
 # TODO: Docstring
 
 
-def _load_monthly_asset_data (
+def _write_atomic(path: str, write: Callable[[str], None]) -> None:
+    tmp = f"{path}.tmp-{os.getpid()}"
+    write(tmp)
+    os.replace(tmp, path)
+
+
+def _write_json(path: str, obj: dict) -> None:
+    with open(path, "w") as f:
+        json.dump(obj, f)
+
+
+def _missing_ranges(
+        lo: dt.date, hi: dt.date, covered: tuple[dt.date, dt.date] | None
+) -> list[tuple[dt.date, dt.date]]:
+    """
+    Parts of [lo, hi] not inside the covered range of a year partition.
+    """
+
+    if covered is None:
+        return [(lo, hi)]
+
+    gaps = []
+    if lo < covered[0]:
+        gaps.append((lo, covered[0] - dt.timedelta(days=1)))
+    if hi > covered[1]:
+        gaps.append((covered[1] + dt.timedelta(days=1), hi))
+
+    return gaps
+
+
+def _trusted_until(watermark: dt.date | None) -> dt.date:
+    """
+    Last date that may be recorded as cached, given the latest date the
+    provider has returned (watermark). Months before the previous
+    calendar month are settled and always trusted. The current and the
+    previous month may still be filling in, so they are trusted only up
+    to the month before the one the provider's data stops in.
+    """
+
+    settled = (dt.date.today().replace(day=1) - dt.timedelta(days=1)).replace(day=1) - dt.timedelta(days=1)
+    if watermark is None:
+        return settled
+
+    return max(settled, watermark.replace(day=1) - dt.timedelta(days=1))
+
+
+def _read_manifest(path: str) -> dict:
+    if not os.path.exists(path):
+        return {"years": {}}
+
+    with open(path) as f:
+        manifest = json.load(f)
+
+    # Manifests written before coverage was tracked per year hold one
+    # column list for the whole source.
+    columns = manifest.pop("columns", [])
+    manifest["years"] = {
+        year: entry if isinstance(entry, dict) else {"range": entry, "columns": columns}
+        for year, entry in manifest["years"].items()
+    }
+
+    return manifest
+
+
+def _scan_cached (
+        source: str,
+        fetch: Callable[[dt.date, dt.date, list[str]], pl.DataFrame],
+        start: dt.date, end: dt.date, columns: list[str]
+) -> pl.LazyFrame:
+    """
+    Read-through cache for one source of the active data provider. Each
+    calendar year is stored as
+    {TMP}/{provider.cache_name}/{source}/year={year}/data.parquet, with a
+    manifest recording the date range and columns held per year. Only
+    date ranges not yet covered are fetched from the provider, with
+    every column the year holds; columns a year lacks are fetched for
+    its covered range alone and joined onto the stored rows. Coverage
+    of recent months is only recorded up to data the provider actually
+    returned (see _trusted_until), so ranges it cannot serve yet are
+    fetched again on later runs. The result is a scan of the year files
+    touched by [start, end], with the date predicate and column
+    selection pushed down to the Parquet reader.
+
+    Without TMP set, or for providers that are already local
+    (cache_name None), this falls back to a direct provider load.
+    """
+
+    fetch = traced(f"load.{source}")(fetch)
+
+    tmp, cache_name = get_tmp(), get_provider().cache_name
+    if tmp is None or cache_name is None:
+        return fetch(start, end, columns).lazy()
+
+    root = os.path.join(tmp, cache_name, source)
+    manifest_path = os.path.join(root, "manifest.json")
+
+    manifest = _read_manifest(manifest_path)
+    os.makedirs(root, exist_ok=True)
+
+    # The newest data seen so far: recent coverage is always backed by
+    # returned rows. Years are filled latest first, so older years are
+    # judged against the newest data of this request.
+    watermark = max((dt.date.fromisoformat(e["range"][1]) for e in manifest["years"].values()), default=None)
+
+    files = []
+    for year in range(end.year, start.year - 1, -1):
+        lo, hi = max(start, dt.date(year, 1, 1)), min(end, dt.date(year, 12, 31))
+        path = os.path.join(root, f"year={year}", "data.parquet")
+
+        entry = manifest["years"].get(str(year))
+        covered = tuple(dt.date.fromisoformat(d) for d in entry["range"]) if entry else None
+        stored = entry["columns"] if entry else []
+
+        extra = [c for c in columns if c not in stored]
+        wanted = stored + extra
+
+        gaps = _missing_ranges(lo, hi, covered)
+        if gaps or extra:
+            frames = [fetch(a, b, wanted) for a, b in gaps]
+            if covered is not None:
+                old = pl.read_parquet(path).filter(pl.col('date').is_between(*covered))
+                if extra:
+                    keys = [c for c in ['date', 'barrid'] if c in stored]
+                    old = old.join(fetch(*covered, keys + extra), on=keys, how='left')
+                frames.append(old)
+            elif os.path.exists(path):
+                os.remove(path)
+
+            year_df = pl.concat(frames, how="diagonal_relaxed").select(wanted).sort('date')
+
+            if not year_df.is_empty():
+                watermark = max(watermark or year_df['date'].max(), year_df['date'].max())
+
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            _write_atomic(path, year_df.write_parquet)
+
+            top = min(hi, _trusted_until(watermark))
+            if covered is not None:
+                covered = (min(lo, covered[0]), max(top, covered[1]))
+            elif top >= lo:
+                covered = (lo, top)
+
+            if covered is not None:
+                manifest["years"][str(year)] = {
+                    "range": [covered[0].isoformat(), covered[1].isoformat()],
+                    "columns": wanted,
+                }
+                _write_atomic(manifest_path, lambda tmp: _write_json(tmp, manifest))
+
+        files.append(path)
+
+    # Years can hold different column sets; each holds at least columns.
+    return (pl.scan_parquet(files[::-1], extra_columns="ignore")
+    .filter(pl.col('date').is_between(start, end))
+    .select(columns)
+    )
+
+
+def scan_assets(start: dt.date, end: dt.date, columns: list[str]) -> pl.LazyFrame:
+    """
+    In-universe asset data from the data provider, through the local
+    Parquet cache.
+    """
+
+    return _scan_cached(
+        "assets",
+        lambda s, e, cols: get_provider().load_assets(s, e, cols),
+        start, end, columns,
+    )
+
+
+def scan_exposures(start: dt.date, end: dt.date, columns: list[str]) -> pl.LazyFrame:
+    """
+    In-universe factor exposures from the data provider, through the
+    local Parquet cache.
+    """
+
+    return _scan_cached(
+        "exposures",
+        lambda s, e, cols: get_provider().load_exposures(s, e, cols),
+        start, end, columns,
+    )
+
+
+def scan_factors(start: dt.date, end: dt.date, factors: list[str]) -> pl.LazyFrame:
+    """
+    Daily factor returns from the data provider, through the local
+    Parquet cache.
+    """
+
+    return _scan_cached(
+        "factors",
+        lambda s, e, cols: get_provider().load_factors(s, e, [c for c in cols if c != 'date']),
+        start, end, ['date'] + factors,
+    )
+
+
+def _date_chunks(
+        start: dt.date, end: dt.date, chunk_years: int
+) -> list[tuple[dt.date, dt.date]]:
+    """
+    Split [start, end] into consecutive ranges of chunk_years calendar
+    years. Chunks always break on a year boundary, so no month is split.
+    """
+
+    chunks = []
+    for year in range(start.year, end.year + 1, chunk_years):
+        lo = max(start, dt.date(year, 1, 1))
+        hi = min(end, dt.date(year + chunk_years - 1, 12, 31))
+        chunks.append((lo, hi))
+
+    return chunks
+
+
+def _scan_monthly_asset_data (
         start: dt.date, end: dt.date
-) -> pl.DataFrame:
+) -> pl.LazyFrame:
+    """
+    Lazy monthly asset panel for [start, end]; see _load_monthly_asset_data.
+    """
 
-    columns = ['date', 'barrid'] + FACTORS
+    factors = get_factors()
+    columns = ['date', 'barrid'] + factors
 
-    daily = load_assets(start=start, end=end, columns=['date', 'barrid', 'return', 'market_cap', 'specific_risk'], in_universe=True).join(
-        load_exposures(start=start, end=end, columns=columns, in_universe=True),
+    daily = scan_assets(start=start, end=end, columns=['date', 'barrid', 'return', 'market_cap', 'specific_risk']).join(
+        scan_exposures(start=start, end=end, columns=columns),
         on=['barrid', 'date'],
         how='inner'
-    ).sort(['barrid', 'date'])
+    )
 
-    return (daily.lazy().with_columns(
+    return (daily.with_columns(
         pl.col('date').dt.truncate('1mo').alias('month')
     )
     .group_by(['month', 'barrid']).agg(
         [(np.log(1 + pl.col('return')*.01).sum())
         .alias('ret'),
-        pl.col('market_cap').last(),
+        pl.col('market_cap').sort_by('date').last(),
         (np.sqrt(np.pow(pl.col('specific_risk'), 2).mean()))]
         +
-        [pl.col(fac).mean() for fac in FACTORS]
+        [pl.col(fac).mean() for fac in factors]
         +
-        [pl.col('date').last()]
+        [pl.col('date').max()]
+    )
+    )
+
+
+def _scan_daily_asset_data (
+        start: dt.date, end: dt.date
+) -> pl.LazyFrame:
+    """
+    Lazy daily asset panel for [start, end]: specific risk and style
+    exposures per date and barrid, for the daily signal path.
+    """
+
+    return scan_assets(start=start, end=end, columns=['date', 'barrid', 'specific_risk']).join(
+        scan_exposures(start=start, end=end, columns=['date', 'barrid'] + get_factors()),
+        on=['barrid', 'date'],
+        how='inner'
     )
+
+
+@traced("_load_monthly_asset_data")
+def _load_monthly_asset_data (
+        start: dt.date, end: dt.date, chunk_years: int | None = 1
+) -> pl.DataFrame:
+    """
+    Monthly asset panel (log return, month-end market cap, RMS specific
+    risk and mean style exposures per month and barrid).
+
+    The daily panel is processed chunk_years calendar years at a time
+    with the polars streaming engine, and each chunk is aggregated to
+    month/barrid before the next one is read. Peak memory therefore
+    scales with one chunk of daily rows, not the full history. Pass
+    chunk_years=None to stream the whole range in one query.
+    """
+
+    chunks = [(start, end)] if chunk_years is None else _date_chunks(start, end, chunk_years)
+
+    monthly = [
+        _scan_monthly_asset_data(lo, hi).collect(engine="streaming")
+        for lo, hi in chunks
+    ]
+
+    return (pl.concat(monthly, how="vertical")
     .sort(['barrid', 'month'])
-    .collect()
     )
 
 
@@ -46,10 +305,10 @@ def _scan_monthly_factor_returns (
         start: dt.date, end: dt.date
         ) -> pl.LazyFrame:
 
-    daily = load_factors(start=start, end=end, factors=FACTORS)
+    daily = scan_factors(start=start, end=end, factors=get_factors())
     daily = daily.unpivot(index='date', variable_name='factor', value_name='ret')
 
-    return (daily.lazy().with_columns(
+    return (daily.with_columns(
         pl.col('date').dt.truncate('1mo').alias('month'),
         pl.col('ret').shift(1).over('factor').alias('lag_ret')
     )
@@ -58,7 +317,7 @@ def _scan_monthly_factor_returns (
     )
     .sort(['factor', 'month'])
     .with_columns(
-        pl.col('ret').shift(1).alias('lag_ret')
+        pl.col('ret').shift(1).over('factor').alias('lag_ret')
     )
     )
 
@@ -69,7 +328,7 @@ def _scan_monthly_pc_returns (
     
     pca_engine = PcaEngine(n_components=n_compenents, lookback_window=lookback_window)
     
-    factor_returns = load_factors(start=start, end=end, factors=FACTORS).lazy()
+    factor_returns = scan_factors(start=start, end=end, factors=get_factors())
 
     pcs = pca_engine.fit_transform_rolling_monthly(start, end, factor_returns)
 
@@ -1,34 +1,136 @@
 import polars as pl
+import numpy as np
 
-from ._constants import FACTORS
+from ._constants import get_factors
+from ._instrument import traced
 
 #TODO: require columns for each df, docstring
 
 
+@traced("construct_asset_signal_monthly")
 def construct_asset_signal_monthly (
         factor_signals_monthly: pl.DataFrame,
         asset_data_monthly: pl.DataFrame,
 ) -> pl.DataFrame:
+    """
+    Map monthly factor signals onto assets: each asset's signal is its
+    exposure row times that month's factor-signal vector.
 
-    factor_signals_monthly_wide = (factor_signals_monthly.pivot(on='factor', index='month', values='signal'))
-    
-    merged = asset_data_monthly.join(factor_signals_monthly_wide, on='month', how='left', suffix='_signal')
+    The factor signals are pivoted to a small (months x F) matrix with
+    columns in FACTORS order, every asset-month is matched to its row
+    with searchsorted, and the products are summed by name in one
+    einsum, so the asset panel is never widened by a join. Asset-months
+    without a signal for their month, or with missing data, are dropped;
+    with no signals or no asset rows at all the result is empty.
+    """
 
-    prods = merged.with_columns(merged.columns)
-    for fac in FACTORS:
-        prods = prods.with_columns(
-            (pl.col(fac) * pl.col(f'{fac}_signal')).alias(f'{fac}_signal_exposure')
-        ).drop([fac, f'{fac}_signal'])
+    columns = [pl.col('month'), pl.col('barrid'), pl.col('ret'), pl.col('specific_risk'), pl.col('market_cap')]
 
-    prods = prods.drop_nulls()
+    signals_wide = (factor_signals_monthly
+    .pivot(on='factor', index='month', values='signal')
+    .sort('month')
+    )
+
+    factors = get_factors()
+
+    assets = asset_data_monthly.drop_nulls()
+
+    if signals_wide.is_empty() or assets.is_empty():
+        return assets.clear().select(columns).with_columns(pl.lit(None, dtype=pl.Float64).alias('signal'))
+
+    months = signals_wide['month'].to_numpy()
+    S = signals_wide.select(factors).to_numpy().astype(np.float64)
+
+    asset_months = assets['month'].to_numpy()
+
+    idx = np.searchsorted(months, asset_months).clip(max=max(len(months) - 1, 0))
+    has_signal = (months[idx] == asset_months) if len(months) else np.zeros(assets.height, dtype=bool)
+
+    E = assets.select(factors).to_numpy()
+    signal = np.einsum('nf,nf->n', E[has_signal], S[idx[has_signal]])
+
+    return (assets.filter(pl.Series(has_signal)).select(
+        columns
+    )
+    .with_columns(
+        pl.Series('signal', signal)
+    )
+    .filter(pl.col('signal').is_not_nan())
+    .sort(['barrid', 'month'])
+    )
+
+
+def scan_asset_signal_monthly (
+        factor_signals_monthly: pl.LazyFrame,
+        asset_data_monthly: pl.LazyFrame,
+) -> pl.LazyFrame:
+    """
+    Lazy version of construct_asset_signal_monthly, for composing the
+    mapping into one polars query. The asset panel is mapped by
+    construct_asset_signal_monthly itself in a single node, against the
+    factor signals collected when the query runs, so the asset-months
+    are never joined against the wide signals.
+    """
+
+    schema = asset_data_monthly.select('month', 'barrid', 'ret', 'specific_risk', 'market_cap').collect_schema()
+    schema['signal'] = pl.Float64
 
-    return (prods.select(
-        pl.col('month'),
+    # The mapping reads the exposure columns and sorts its output, so
+    # neither projections nor slices may be pushed past it.
+    return asset_data_monthly.map_batches(
+        lambda assets: construct_asset_signal_monthly(factor_signals_monthly.collect(), assets),
+        schema=schema, projection_pushdown=False, slice_pushdown=False,
+    )
+
+
+def scan_asset_signal_daily (
+        factor_signals: pl.LazyFrame,
+        asset_data_daily: pl.LazyFrame,
+        max_staleness: str = "30d",
+) -> pl.LazyFrame:
+    """
+    Map factor signals onto daily exposures. Each asset-day takes the
+    latest factor-signal row stamped on or before its date (an as-of
+    join on the signals' 'month' column, so signals may be stamped at
+    any frequency), provided it is at most max_staleness old; the
+    default lets a month-start signal cover its whole month only.
+
+    Both sides are sorted by date and the asset days are only ever
+    joined against the small wide signal table, so the query streams
+    over the daily panel without widening it by more than F columns.
+    Returns date, barrid, specific_risk and signal.
+    """
+
+    factors = get_factors()
+
+    signals_wide = (_widen_signals(factor_signals, factors)
+    .rename({'month': 'signal_date'})
+    .sort('signal_date')
+    )
+
+    return (asset_data_daily
+    .drop_nulls()
+    .sort('date')
+    .join_asof(signals_wide, left_on='date', right_on='signal_date', strategy='backward', tolerance=max_staleness)
+    .select(
+        pl.col('date'),
         pl.col('barrid'),
-        pl.col('ret'),
         pl.col('specific_risk'),
-        pl.col('market_cap'),
-        prods[:, 5:19].sum_horizontal().alias('signal')
+        _exposure_product(factors),
     )
-    .sort(['barrid', 'month'])
-    )
\ No newline at end of file
+    .filter(pl.col('signal').is_not_null() & pl.col('signal').is_not_nan())
+    )
+
+
+def _widen_signals(factor_signals: pl.LazyFrame, factors: list[str]) -> pl.LazyFrame:
+    # A lazy pivot: one filtered aggregate per factor.
+    return factor_signals.group_by('month').agg(
+        [pl.col('signal').filter(pl.col('factor') == fac).first().cast(pl.Float64).alias(f'{fac}_signal')
+         for fac in factors]
+    )
+
+
+def _exposure_product(factors: list[str]) -> pl.Expr:
+    return pl.sum_horizontal(
+        [pl.col(fac) * pl.col(f'{fac}_signal') for fac in factors], ignore_nulls=False
+    ).alias('signal')
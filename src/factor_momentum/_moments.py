@@ -0,0 +1,126 @@
+import numpy as np
+
+
+def _standardize(mean: np.ndarray, cov: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Turn a mean and population covariance into the StandardScaler-style
+    (mean, scale, standardized covariance) triple. Zero variances are
+    mapped to a scale of 1, as StandardScaler does.
+    """
+
+    cov = (cov + cov.T) * 0.5
+
+    scale = np.sqrt(np.clip(np.diag(cov), 0.0, None))
+    scale[scale < 10 * np.finfo(float).eps] = 1.0
+
+    return mean, scale, cov / np.outer(scale, scale)
+
+
+class SlidingMoments:
+    """
+    Running sums and cross-products of the rows currently inside a
+    window. Rows are added as they enter the window and removed as
+    they leave, so moving the window costs O(F^2) per row instead of
+    a full pass over every row in it.
+
+    Rows are accumulated relative to a fixed shift (usually a rough
+    column mean) to keep the sums small and limit cancellation when
+    rows are later subtracted.
+    """
+
+    def __init__(self, n_features: int, shift: np.ndarray | None = None):
+        self.n = 0
+        self.shift = np.zeros(n_features) if shift is None else np.asarray(shift, dtype=float)
+        self.sum = np.zeros(n_features)
+        self.cross = np.zeros((n_features, n_features))
+
+
+    def add(self, rows: np.ndarray, weights: np.ndarray | None = None) -> None:
+        self._accumulate(rows, weights, 1)
+
+
+    def remove(self, rows: np.ndarray, weights: np.ndarray | None = None) -> None:
+        self._accumulate(rows, weights, -1)
+
+
+    def _accumulate(self, rows: np.ndarray, weights: np.ndarray | None, sign: int) -> None:
+        """
+        Add (sign=1) or remove (sign=-1) rows, each counted with its
+        weight (default 1). A weight of 0 leaves a row out entirely.
+        """
+
+        if rows.shape[0] == 0:
+            return
+
+        X = rows - self.shift
+
+        if weights is None:
+            self.n += sign * X.shape[0]
+            self.sum += sign * X.sum(axis=0)
+            self.cross += sign * (X.T @ X)
+            return
+
+        self.n += sign * weights.sum()
+        self.sum += sign * (weights @ X)
+        self.cross += sign * ((X.T * weights) @ X)
+
+
+    def standardized(self) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Return the window mean, the StandardScaler-style scale
+        (population std, zero variances mapped to 1) and the covariance
+        matrix of the standardized rows.
+        """
+
+        m = self.sum / self.n
+
+        return _standardize(m + self.shift, self.cross / self.n - np.outer(m, m))
+
+
+class CumulativeMoments:
+    """
+    Mean and centered cross-products of every row seen so far, for
+    expanding windows. New rows are folded in as a batch with the
+    pairwise (Chan/Welford) update, so each step only touches the rows
+    added since the previous one and stays numerically stable over long
+    histories.
+    """
+
+    def __init__(self, n_features: int):
+        self.n = 0
+        self.mean = np.zeros(n_features)
+        self.m2 = np.zeros((n_features, n_features))
+
+
+    def add(self, rows: np.ndarray, weights: np.ndarray | None = None) -> None:
+        if rows.shape[0] == 0:
+            return
+
+        if weights is None:
+            k = rows.shape[0]
+            batch_mean = rows.mean(axis=0)
+            D = rows - batch_mean
+            batch_m2 = D.T @ D
+        else:
+            k = weights.sum()
+            if k <= 0:
+                return
+
+            batch_mean = (weights @ rows) / k
+            D = rows - batch_mean
+            batch_m2 = (D.T * weights) @ D
+
+        delta = batch_mean - self.mean
+        n = self.n + k
+
+        self.m2 += batch_m2 + np.outer(delta, delta) * (self.n * k / n)
+        self.mean = self.mean + delta * (k / n)
+        self.n = n
+
+
+    def standardized(self) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Same output as SlidingMoments.standardized for all rows added.
+        """
+
+        return _standardize(self.mean.copy(), self.m2 / self.n)
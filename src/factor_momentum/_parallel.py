@@ -0,0 +1,107 @@
+import datetime as dt
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from ._pca_states import PcaStates
+
+
+_worker = {}
+
+
+def _attach(name: str, shape: tuple[int, int], dates: np.ndarray, weights: np.ndarray | None, params: dict) -> None:
+    """
+    Worker initializer. Attaches to the shared returns matrix once per
+    process, so tasks only carry the dates they should fit.
+    """
+
+    shm = shared_memory.SharedMemory(name=name)
+
+    _worker["shm"] = shm
+    _worker["values"] = np.ndarray(shape, dtype=np.float64, buffer=shm.buf)
+    _worker["dates"] = dates
+    _worker["weights"] = weights
+    _worker["params"] = params
+
+
+def _fit_chunk(kind: str, dates: list[dt.date], start_date: dt.date | None) -> tuple[PcaStates, dict[dt.date, int]]:
+    from .PCA import PcaEngine
+
+    engine = PcaEngine(**_worker["params"])
+    engine.dates = _worker["dates"]
+    engine.values = _worker["values"]
+    engine.weights = _worker["weights"]
+    engine.progress = False
+    engine.states.reserve(dates, n_features=engine.values.shape[1])
+
+    if kind == "lookback":
+        engine._fit_lookback_dates(dates)
+    else:
+        engine._fit_stretch_dates(dates, start_date)
+
+    return engine.states, engine.iterations
+
+
+def fit_parallel(
+        engine, dates: list[dt.date], kind: str, start_date: dt.date | None = None
+        ) -> PcaStates:
+    """
+    Fit PCA states for dates across engine.n_jobs worker processes.
+
+    The engine's materialized returns matrix is copied once into a
+    shared memory block that every worker maps instead of receiving a
+    pickled copy per task. Dates are split into contiguous chunks (so
+    the incremental modes only re-seed one window per chunk) and the
+    results are merged back in date order, independent of which worker
+    finishes first.
+
+    Workers are spawned, not forked: by the time this runs polars has
+    started its thread pool, which a forked child can deadlock on. As
+    with any spawned pool, scripts must guard their entry point with
+    `if __name__ == "__main__"`.
+    """
+
+    from tqdm import tqdm
+
+    merged = PcaStates(engine.n_components, engine.values.shape[1])
+
+    dates = sorted(dates)
+    if not dates:
+        return merged
+
+    n_chunks = min(len(dates), engine.n_jobs * 4)
+    chunks = [list(chunk) for chunk in np.array_split(np.array(dates, dtype=object), n_chunks)]
+
+    params = {
+        "n_components": engine.n_components,
+        "lookback_window": engine.lookback,
+        "mode": engine.mode,
+        "solver": engine.solver,
+    }
+
+    shm = shared_memory.SharedMemory(create=True, size=max(engine.values.nbytes, 1))
+    try:
+        shared = np.ndarray(engine.values.shape, dtype=np.float64, buffer=shm.buf)
+        shared[:] = engine.values
+
+        with ProcessPoolExecutor(
+            max_workers=engine.n_jobs,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_attach,
+            initargs=(shm.name, engine.values.shape, engine.dates, engine.weights, params),
+        ) as pool:
+            futures = [pool.submit(_fit_chunk, kind, chunk, start_date) for chunk in chunks]
+            results = [future.result() for future in tqdm(futures, desc=f"PCA ({engine.n_jobs} jobs)", disable=not engine.progress)]
+
+        del shared
+    finally:
+        shm.close()
+        shm.unlink()
+
+    for states, iterations in results:
+        merged.update(states)
+        engine.iterations.update(iterations)
+
+    return merged
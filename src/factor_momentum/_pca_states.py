@@ -0,0 +1,230 @@
+import datetime as dt
+from typing import Iterator
+
+import numpy as np
+
+
+FIELDS = ["mean", "scale", "components", "explained_var"]
+
+
+class PcaStates:
+    """
+    Columnar container for the PCA states of an engine.
+
+    Instead of one dict of small arrays per date, every field is a
+    preallocated array with one row per date, kept sorted by date:
+
+        dates          (T,)        datetime64[D]
+        mean, scale    (T, F)
+        components     (T, k, F)
+        explained_var  (T, k)
+        valid          (T,)        False where the fit was skipped
+
+    It still behaves like the old states dict for single dates
+    (``date in states``, ``states[date]`` returns a dict of views or
+    None, ``states[date] = state``), while whole-history consumers can
+    slice the arrays directly.
+    """
+
+    def __init__(self, n_components: int, n_features: int | None = None):
+        self.n_components = n_components
+        self.n_features = n_features
+        self._index = {}
+        self._allocate(np.array([], dtype='datetime64[D]'))
+
+
+    def _allocate(self, dates: np.ndarray, capacity: int | None = None) -> None:
+        # Rows live in buffers of capacity >= len(dates); the public
+        # arrays are views of their first len(dates) rows, so dates
+        # appended after the last one fill spare rows instead of
+        # reallocating.
+        T, k, F = len(dates), self.n_components, self.n_features or 0
+        capacity = max(T, capacity or 0)
+
+        self._buffers = {
+            "dates": np.empty(capacity, dtype='datetime64[D]'),
+            "mean": np.full((capacity, F), np.nan),
+            "scale": np.full((capacity, F), np.nan),
+            "components": np.full((capacity, k, F), np.nan),
+            "explained_var": np.full((capacity, k), np.nan),
+            "valid": np.zeros(capacity, dtype=bool),
+        }
+        self._buffers["dates"][:T] = dates
+        self._view(T)
+
+
+    def _view(self, T: int) -> None:
+        for f, buffer in self._buffers.items():
+            setattr(self, f, buffer[:T])
+
+
+    def _owns_buffers(self) -> bool:
+        # False once the arrays were replaced from outside (e.g. by
+        # memory-mapped arrays from StateCache).
+        return all(getattr(self, f).base is buffer for f, buffer in self._buffers.items())
+
+
+    def reserve(self, dates: list[dt.date] | np.ndarray, n_features: int | None = None) -> None:
+        """
+        Make room for dates, keeping existing rows. New rows start
+        invalid until they are assigned. Capacity grows geometrically,
+        so reserving one later date at a time costs amortized O(1)
+        copies per date.
+        """
+
+        if self.n_features is None:
+            self.n_features = n_features
+
+        new = np.unique(np.asarray(dates, dtype='datetime64[D]'))
+        new = new[[date not in self._index for date in new.tolist()]]
+        same_width = self.mean.shape[1] == (self.n_features or 0)
+        if not len(new) and same_width:
+            return
+
+        T = len(self.dates)
+        appending = not T or not len(new) or new[0] > self.dates[-1]
+
+        if same_width and appending and T + len(new) <= len(self._buffers["dates"]) and self._owns_buffers():
+            self._buffers["dates"][T:T + len(new)] = new
+            self._view(T + len(new))
+            self._index.update({date: T + i for i, date in enumerate(new.tolist())})
+            return
+
+        old = {f: getattr(self, f) for f in FIELDS + ["valid"]}
+        old_dates = self.dates
+
+        merged = np.union1d(old_dates, new)
+        self._allocate(merged, capacity=len(merged) if not T else max(len(merged), 2 * T))
+
+        rows = np.searchsorted(self.dates, old_dates)
+        for f, values in old.items():
+            if values.shape[-1:] == (0,) and f != "valid":
+                continue
+            getattr(self, f)[rows] = values
+
+        self._index = {date: i for i, date in enumerate(self.dates.tolist())}
+
+
+    def rows(self, dates: list[dt.date] | np.ndarray) -> np.ndarray:
+        """
+        Row positions of dates, which must already be reserved.
+        """
+
+        dates = np.asarray(dates, dtype='datetime64[D]')
+        rows = np.searchsorted(self.dates, dates)
+
+        missing = (rows >= len(self.dates)) | (self.dates[rows.clip(max=max(len(self.dates) - 1, 0))] != dates) \
+            if len(self.dates) else np.ones(len(dates), dtype=bool)
+        if missing.any():
+            raise KeyError(dates[missing][0].item())
+
+        return rows
+
+
+    def assign(
+            self, dates: list[dt.date] | np.ndarray, mean: np.ndarray, scale: np.ndarray,
+            components: np.ndarray, explained_var: np.ndarray
+            ) -> None:
+        """
+        Vectorized write of fitted states for several dates at once.
+        """
+
+        dates = np.asarray(dates, dtype='datetime64[D]')
+        self.reserve(dates, n_features=mean.shape[-1])
+
+        rows = self.rows(dates)
+        self.mean[rows] = mean
+        self.scale[rows] = scale
+        self.components[rows] = components
+        self.explained_var[rows] = explained_var
+        self.valid[rows] = True
+
+
+    def invalidate(self, dates: list[dt.date] | np.ndarray, n_features: int | None = None) -> None:
+        dates = np.asarray(dates, dtype='datetime64[D]')
+        self.reserve(dates, n_features=n_features)
+
+        self.valid[self.rows(dates)] = False
+
+
+    def update(self, other: "PcaStates | dict[dt.date, dict | None]") -> None:
+        if isinstance(other, PcaStates):
+            if self.n_features is None:
+                self.n_features = other.n_features
+
+            self.invalidate(other.dates[~other.valid])
+
+            v = other.valid
+            if v.any():
+                self.assign(other.dates[v], other.mean[v], other.scale[v], other.components[v], other.explained_var[v])
+            return
+
+        for date, state in other.items():
+            self[date] = state
+
+
+    def select(self, dates: list[dt.date] | np.ndarray) -> "PcaStates":
+        """
+        Copy of the rows for dates, as a new PcaStates.
+        """
+
+        rows = self.rows(dates)
+
+        out = PcaStates(self.n_components, self.n_features)
+        out.dates = self.dates[rows]
+        for f in FIELDS + ["valid"]:
+            setattr(out, f, getattr(self, f)[rows].copy())
+        out._index = {date: i for i, date in enumerate(out.dates.tolist())}
+
+        return out
+
+
+    def __contains__(self, date: dt.date) -> bool:
+        return date in self._index
+
+
+    def __getitem__(self, date: dt.date) -> dict | None:
+        i = self._index.get(date)
+        if i is None:
+            raise KeyError(date)
+
+        if not self.valid[i]:
+            return None
+
+        return {f: getattr(self, f)[i] for f in FIELDS}
+
+
+    def __setitem__(self, date: dt.date, state: dict | None) -> None:
+        if state is None:
+            self.invalidate([date])
+            return
+
+        self.assign(
+            [date],
+            np.asarray(state["mean"])[None],
+            np.asarray(state["scale"])[None],
+            np.asarray(state["components"])[None],
+            np.asarray(state["explained_var"])[None],
+        )
+
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+
+    def __iter__(self) -> Iterator[dt.date]:
+        return iter(self.keys())
+
+
+    def keys(self) -> list[dt.date]:
+        return self.dates.tolist()
+
+
+    def items(self) -> Iterator[tuple[dt.date, dict | None]]:
+        for date in self.keys():
+            yield date, self[date]
+
+
+    @property
+    def nbytes(self) -> int:
+        return sum(getattr(self, f).nbytes for f in FIELDS + ["dates", "valid"])
@@ -0,0 +1,229 @@
+import datetime as dt
+import json
+import os
+from abc import ABC, abstractmethod
+
+import numpy as np
+import polars as pl
+
+from ._constants import load_env, get_factors
+
+
+PROVIDER_ENV = "FM_LOCAL_DATA"
+
+SOURCES = ["factors", "assets", "exposures"]
+
+
+class DataProvider(ABC):
+    """
+    Where factor_momentum reads its raw data from. Implementations
+    return eager DataFrames with a 'date' column (plus 'barrid' for
+    assets and exposures), restricted to [start, end] and to the
+    requested columns. Assets and exposures are in-universe only.
+
+    cache_name names the directory under TMP that the loaders' Parquet
+    read-through cache uses for this provider; None disables that cache
+    (for providers that are already local).
+    """
+
+    cache_name: str | None = None
+
+    def fingerprint(self) -> str:
+        """
+        Identifies the data this provider serves, for the stage
+        checkpoint keys. Override when instances differ in content.
+        Growth of the data over time is covered separately: the raw
+        checkpoint keys also include the last available date.
+        """
+
+        return f"{type(self).__module__}.{type(self).__qualname__}"
+
+    @abstractmethod
+    def factor_names(self, type: str = "style") -> list[str]:
+        ...
+
+    @abstractmethod
+    def load_factors(self, start: dt.date, end: dt.date, factors: list[str]) -> pl.DataFrame:
+        ...
+
+    @abstractmethod
+    def load_assets(self, start: dt.date, end: dt.date, columns: list[str]) -> pl.DataFrame:
+        ...
+
+    @abstractmethod
+    def load_exposures(self, start: dt.date, end: dt.date, columns: list[str]) -> pl.DataFrame:
+        ...
+
+
+class SfQuantProvider(DataProvider):
+    """
+    The lab database, through sf_quant.data. sf_quant is imported on
+    first use, so it is only required when this provider is read.
+    """
+
+    cache_name = "sf_quant_cache"
+
+    def factor_names(self, type: str = "style") -> list[str]:
+        from sf_quant.data.factors import get_factor_names
+
+        return get_factor_names(type)
+
+    def load_factors(self, start: dt.date, end: dt.date, factors: list[str]) -> pl.DataFrame:
+        from sf_quant.data.factors import load_factors
+
+        return load_factors(start=start, end=end, factors=factors)
+
+    def load_assets(self, start: dt.date, end: dt.date, columns: list[str]) -> pl.DataFrame:
+        from sf_quant.data.assets import load_assets
+
+        return load_assets(start=start, end=end, columns=columns, in_universe=True)
+
+    def load_exposures(self, start: dt.date, end: dt.date, columns: list[str]) -> pl.DataFrame:
+        from sf_quant.data.exposures import load_exposures
+
+        return load_exposures(start=start, end=end, columns=columns, in_universe=True)
+
+
+class ArrowProvider(DataProvider):
+    """
+    Local data in root as uncompressed Arrow IPC files sorted by date:
+
+        root/factor_names.json    {"style": [...], ...}
+        root/factors.arrow        date + one column per factor
+        root/assets.arrow         date, barrid, asset columns
+        root/exposures.arrow      date, barrid, exposure columns
+
+    Files are memory-mapped once and date ranges are found by binary
+    search on the date column, so a read is a zero-copy slice of the
+    mapped file; only the pages actually touched are loaded. Build a
+    store with export_arrow.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        self._tables = {}
+
+    def _table(self, source: str):
+        import pyarrow as pa
+
+        if source not in self._tables:
+            path = os.path.join(self.root, f"{source}.arrow")
+            table = pa.ipc.open_file(pa.memory_map(path, "r")).read_all()
+            dates = table.column("date").to_numpy().astype("datetime64[D]")
+
+            self._tables[source] = (table, dates)
+
+        return self._tables[source]
+
+    def fingerprint(self) -> str:
+        stamps = sorted(
+            (name, os.stat(os.path.join(self.root, name)).st_mtime_ns)
+            for name in os.listdir(self.root) if name.endswith((".arrow", ".json"))
+        )
+
+        return f"{super().fingerprint()}:{os.path.abspath(self.root)}:{stamps}"
+
+    def _read(self, source: str, start: dt.date, end: dt.date, columns: list[str]) -> pl.DataFrame:
+        table, dates = self._table(source)
+
+        lo = np.searchsorted(dates, np.datetime64(start, "D"), "left")
+        hi = np.searchsorted(dates, np.datetime64(end, "D"), "right")
+
+        return pl.from_arrow(table.slice(lo, hi - lo).select(columns), rechunk=False)
+
+    def factor_names(self, type: str = "style") -> list[str]:
+        with open(os.path.join(self.root, "factor_names.json")) as f:
+            return json.load(f)[type]
+
+    def load_factors(self, start: dt.date, end: dt.date, factors: list[str]) -> pl.DataFrame:
+        return self._read("factors", start, end, ["date"] + factors)
+
+    def load_assets(self, start: dt.date, end: dt.date, columns: list[str]) -> pl.DataFrame:
+        return self._read("assets", start, end, columns)
+
+    def load_exposures(self, start: dt.date, end: dt.date, columns: list[str]) -> pl.DataFrame:
+        return self._read("exposures", start, end, columns)
+
+
+def export_arrow(
+        provider: DataProvider, root: str, start: dt.date, end: dt.date,
+        asset_columns: list[str], exposure_columns: list[str], types: list[str] | None = None
+) -> None:
+    """
+    Copy [start, end] of provider into an ArrowProvider store at root,
+    one calendar year at a time. Each year is appended to the file as
+    its own record batches as soon as it is loaded, so peak memory is
+    one year of data. Columns must include 'date' (and 'barrid' for
+    assets and exposures). types are the factor-name lists to copy
+    (default: style).
+    """
+
+    import pyarrow as pa
+
+    types = ["style"] if types is None else types
+    os.makedirs(root, exist_ok=True)
+
+    names = {type: provider.factor_names(type) for type in types}
+    with open(os.path.join(root, "factor_names.json"), "w") as f:
+        json.dump(names, f)
+
+    factors = sorted({fac for facs in names.values() for fac in facs})
+
+    fetch = {
+        "factors": lambda s, e: provider.load_factors(s, e, factors),
+        "assets": lambda s, e: provider.load_assets(s, e, asset_columns),
+        "exposures": lambda s, e: provider.load_exposures(s, e, exposure_columns),
+    }
+
+    for source in SOURCES:
+        keys = ['date'] if source == "factors" else ['date', 'barrid']
+        path = os.path.join(root, f"{source}.arrow")
+
+        # Every year is cast to the first year's schema, so the batches
+        # form one table.
+        schema, writer = None, None
+        try:
+            for year in range(start.year, end.year + 1):
+                frame = fetch[source](max(start, dt.date(year, 1, 1)), min(end, dt.date(year, 12, 31)))
+
+                if schema is None:
+                    schema = frame.schema
+                    writer = pa.ipc.new_file(f"{path}.tmp", frame.clear().to_arrow().schema)
+
+                writer.write_table(frame.cast(dict(schema)).sort(keys).to_arrow())
+        finally:
+            if writer is not None:
+                writer.close()
+
+        os.replace(f"{path}.tmp", path)
+
+
+_provider = None
+
+
+def get_provider() -> DataProvider:
+    """
+    The active provider: whatever set_provider installed, otherwise an
+    ArrowProvider over $FM_LOCAL_DATA if that is set, otherwise sf_quant.
+    """
+
+    global _provider
+
+    if _provider is None:
+        load_env()
+        root = os.getenv(PROVIDER_ENV)
+        _provider = ArrowProvider(root) if root else SfQuantProvider()
+
+    return _provider
+
+
+def set_provider(provider: DataProvider | None) -> None:
+    """
+    Install provider for this process; None goes back to the default.
+    The cached factor names are dropped so they are read from the new
+    provider.
+    """
+
+    global _provider
+    _provider = provider
+    get_factors.cache_clear()
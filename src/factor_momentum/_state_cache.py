@@ -0,0 +1,118 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+from ._pca_states import PcaStates, FIELDS
+
+
+class StateCache:
+    """
+    On-disk store of fitted PCA states, keyed by a hash of the input
+    returns matrix, the factor list and the engine parameters.
+
+    Each entry is a directory of .npy files that are memory-mapped on
+    load, so a cache hit costs a few file opens instead of a refit.
+    The total size is capped at max_bytes; the least recently used
+    entries are evicted first.
+    """
+
+    def __init__(self, root: str, max_bytes: int = 2 * 1024**3):
+        self.root = root
+        self.max_bytes = max_bytes
+        os.makedirs(root, exist_ok=True)
+
+
+    @staticmethod
+    def key(dates: np.ndarray, values: np.ndarray, factors: list[str], params: dict) -> str:
+        """
+        Content hash of a returns matrix and the parameters used to fit it.
+        """
+
+        h = hashlib.sha256()
+        h.update(np.ascontiguousarray(dates).view(np.int64).tobytes())
+        h.update(np.ascontiguousarray(values).tobytes())
+        h.update(json.dumps({"factors": list(factors), **params}, sort_keys=True, default=str).encode())
+
+        return h.hexdigest()
+
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, key)
+
+
+    def load(self, key: str) -> PcaStates | None:
+        """
+        Return the stored states for key, or None on a miss. The arrays
+        of the returned PcaStates are read-only memory-mapped files.
+        """
+
+        path = self._path(key)
+        if not os.path.isdir(path):
+            return None
+
+        arrays = {f: np.load(os.path.join(path, f"{f}.npy"), mmap_mode='r') for f in FIELDS}
+        dates = np.load(os.path.join(path, "dates.npy"))
+
+        states = PcaStates(arrays["components"].shape[1], arrays["components"].shape[2])
+        states.dates = dates
+        states.valid = np.load(os.path.join(path, "valid.npy"))
+        for f in FIELDS:
+            setattr(states, f, arrays[f])
+        states._index = {date: i for i, date in enumerate(dates.tolist())}
+
+        os.utime(path)
+
+        return states
+
+
+    def store(self, key: str, states: PcaStates) -> None:
+        """
+        Write states under key, then evict old entries past max_bytes.
+        """
+
+        path = self._path(key)
+        if os.path.isdir(path):
+            return
+
+        tmp = tempfile.mkdtemp(dir=self.root, prefix=".tmp-")
+        try:
+            for f in FIELDS + ["dates", "valid"]:
+                np.save(os.path.join(tmp, f"{f}.npy"), getattr(states, f))
+
+            os.replace(tmp, path)
+        except OSError:
+            shutil.rmtree(tmp, ignore_errors=True)
+            if not os.path.isdir(path):
+                raise
+
+        self._evict(keep=key)
+
+
+    def _evict(self, keep: str) -> None:
+        entries = []
+        for name in os.listdir(self.root):
+            path = self._path(name)
+            if name.startswith(".") or not os.path.isdir(path):
+                continue
+
+            size = sum(entry.stat().st_size for entry in os.scandir(path))
+            entries.append((os.stat(path).st_mtime, size, name))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, name in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if name == keep:
+                continue
+
+            shutil.rmtree(self._path(name), ignore_errors=True)
+            total -= size
+
+
+    def clear(self) -> None:
+        for name in os.listdir(self.root):
+            shutil.rmtree(self._path(name), ignore_errors=True)
@@ -1,12 +1,38 @@
 import polars as pl
+import numpy as np
 import datetime as dt
+from typing import Iterator
 
-from ._loaders import _scan_monthly_factor_returns, _load_monthly_asset_data
-from ._factor_signal_construction import construct_factor_signal_monthly
-from ._map_signal_to_assets import construct_asset_signal_monthly
+from ._loaders import (
+    _scan_monthly_factor_returns, _load_monthly_asset_data, _scan_monthly_asset_data, _scan_daily_asset_data, _date_chunks,
+    scan_factors
+)
+from ._factor_signal_construction import construct_factor_signal_monthly, scan_factor_signal_monthly
+from ._map_signal_to_assets import construct_asset_signal_monthly, scan_asset_signal_monthly, scan_asset_signal_daily
+from ._constants import LOOKBACK_MONTHS, TYPES, get_factors
+from ._instrument import traced
+from ._checkpoints import Checkpoints
+from ._providers import get_provider
+
+# Bump a stage's version when its code changes, so its stored
+# checkpoints (and everything downstream) stop matching.
+STAGE_VERSIONS = {
+    "monthly_factor_returns": 1,
+    "factor_signals": 1,
+    "monthly_asset_data": 1,
+    "asset_signals": 1,
+    "alphas": 1,
+}
 
 #TODO: Docstring
 
+def _check_type(type: str) -> None:
+    if type not in TYPES:
+        raise ValueError(
+            f"Invalid type '{type}'. Must be one of these:  {', '.join(TYPES)}"
+        )
+
+
 def factorspace_signals_monthly(
         start: dt.date,
         end: dt.date,
@@ -30,21 +56,239 @@ def assetspace_signal_monthly(
         asset_data_monthly=_load_monthly_asset_data(start=start, end=end),
     )
 
+def scan_alpha_monthly(
+    start: dt.date,
+    end: dt.date,
+    type: str
+) -> pl.LazyFrame:
+    """
+    The whole alpha pipeline (monthly factor returns, factor signals,
+    asset panel, asset signals, alphas) as a single LazyFrame, so polars
+    can push projections and predicates down to the Parquet scans and
+    run everything in one streaming query.
+    """
+
+    return _alpha_from_asset_signal(scan_asset_signal_monthly(
+        factor_signals_monthly=scan_factor_signal_monthly(
+            monthly_factor_returns=_scan_monthly_factor_returns(start=start, end=end),
+            type=type
+        ),
+        asset_data_monthly=_scan_monthly_asset_data(start=start, end=end),
+    ))
+
+
+@traced("alpha_monthly")
 def alpha_monthly(
     start: dt.date,
     end: dt.date,
     type: str 
 ) -> pl.DataFrame:
     
-    return (assetspace_signal_monthly(start=start, end=end, type=type)
+    return scan_alpha_monthly(start=start, end=end, type=type).collect(engine="streaming")
+
+
+def profile_alpha_monthly(
+    start: dt.date,
+    end: dt.date,
+    type: str
+) -> tuple[pl.DataFrame, str, pl.DataFrame]:
+    """
+    Debug version of alpha_monthly. Returns (alphas, optimized plan,
+    timings), where timings is the per-node frame from
+    LazyFrame.profile() (node, start and end in microseconds).
+    """
+
+    query = scan_alpha_monthly(start=start, end=end, type=type)
+    plan = query.explain(optimized=True)
+
+    alphas, timings = query.profile()
+
+    return alphas, plan, timings
+
+
+@traced("alpha_monthly_by_type")
+def alpha_monthly_by_type(
+    start: dt.date,
+    end: dt.date,
+    types: list[str] | None = None
+) -> pl.DataFrame:
+    """
+    Alphas for several signal types (default: all TYPES) from one load
+    of the monthly factor returns and the monthly asset panel. Only the
+    factor-signal, mapping and alpha steps run once per type. Returns a
+    tidy frame with columns type, date, barrid, alpha.
+    """
+
+    types = TYPES if types is None else types
+    for type in types:
+        _check_type(type)
+
+    factor_returns = _scan_monthly_factor_returns(start=start, end=end).collect().lazy()
+    asset_data = _load_monthly_asset_data(start=start, end=end)
+
+    alphas = [
+        _alpha_from_asset_signal(construct_asset_signal_monthly(
+            factor_signals_monthly=construct_factor_signal_monthly(monthly_factor_returns=factor_returns, type=type),
+            asset_data_monthly=asset_data,
+        ))
+        .select(pl.lit(type).alias('type'), pl.all())
+        for type in types
+    ]
+
+    return pl.concat(alphas, how="vertical")
+
+
+@traced("alpha_monthly_since")
+def alpha_monthly_since(
+    first_month: dt.date,
+    end: dt.date,
+    type: str
+) -> pl.DataFrame:
+    """
+    Alphas for the months from first_month through end only. Factor
+    returns are loaded from just far enough back to build the lagged
+    and rolling signals (LOOKBACK_MONTHS), and the asset panel only for
+    the months being computed. Matches alpha_monthly over a longer range
+    for the same months.
+    """
+
+    month = np.datetime64(first_month, 'M')
+    lookback_start = (month - LOOKBACK_MONTHS[type]).astype('datetime64[D]').item()
+
+    factor_signals = (factorspace_signals_monthly(start=lookback_start, end=end, type=type)
+    .filter(pl.col('month') >= month.astype('datetime64[D]').item())
+    )
+
+    return _alpha_from_asset_signal(construct_asset_signal_monthly(
+        factor_signals_monthly=factor_signals,
+        asset_data_monthly=_load_monthly_asset_data(start=month.astype('datetime64[D]').item(), end=end),
+    ))
+
+
+@traced("alpha_monthly_checkpointed")
+def alpha_monthly_checkpointed(
+    start: dt.date,
+    end: dt.date,
+    type: str,
+    ic: float = 0.05,
+    checkpoints: Checkpoints | None = None
+) -> pl.DataFrame:
+    """
+    alpha_monthly with every stage (monthly factor returns, factor
+    signals, monthly asset panel, asset signals, alphas) checkpointed
+    as Parquet in checkpoints (default: Checkpoints.default()). Each
+    stage is keyed by its parameters, STAGE_VERSIONS and the keys of its
+    inputs, so only stages whose inputs changed are recomputed; e.g. a
+    new ic reruns the alpha step alone. The raw stages are keyed by the
+    date range, the factor list, the provider's fingerprint and the data
+    watermark (the last date with factor returns in the range), so a
+    range reaching past the end of the data is recomputed once the
+    provider has new dates rather than served stale.
+    """
+
+    _check_type(type)
+
+    store = checkpoints or Checkpoints.default()
+    factors = get_factors()
+    # Read with the same factors the stage loads, so on a cold cache
+    # this fills the factor cache the stage then reads from.
+    watermark = scan_factors(start=start, end=end, factors=factors).select(pl.col('date').max()).collect().item()
+    raw = {
+        "start": start, "end": end, "factors": factors,
+        "provider": get_provider().fingerprint(), "watermark": watermark,
+    }
+
+    def stage(name, params, inputs, compute):
+        return store.stage(name, {**params, "version": STAGE_VERSIONS[name]}, inputs, compute)
+
+    factor_returns = stage("monthly_factor_returns", raw, [],
+        lambda: _scan_monthly_factor_returns(start=start, end=end).collect())
+
+    factor_signals = stage("factor_signals", {"type": type}, [factor_returns],
+        lambda: construct_factor_signal_monthly(monthly_factor_returns=factor_returns.load().lazy(), type=type))
+
+    asset_data = stage("monthly_asset_data", raw, [],
+        lambda: _load_monthly_asset_data(start=start, end=end))
+
+    asset_signals = stage("asset_signals", {}, [factor_signals, asset_data],
+        lambda: construct_asset_signal_monthly(
+            factor_signals_monthly=factor_signals.load(),
+            asset_data_monthly=asset_data.load(),
+        ))
+
+    alphas = stage("alphas", {"ic": ic}, [asset_signals],
+        lambda: _alpha_from_asset_signal(asset_signals.load(), ic=ic))
+
+    return alphas.load()
+
+
+def iter_alpha_daily(
+    start: dt.date,
+    end: dt.date,
+    type: str,
+    chunk_years: int = 1
+) -> Iterator[pl.DataFrame]:
+    """
+    Daily alphas for [start, end], one chunk of chunk_years calendar
+    years at a time, in date order.
+
+    The monthly factor signals are built once, from LOOKBACK_MONTHS
+    before start, and are small. Each chunk of daily exposures is then
+    as-of joined onto the latest signal and scored in one streaming
+    query, so peak memory scales with one chunk of daily rows. Alphas
+    are z-scored per date, so chunking does not change them.
+    """
+
+    _check_type(type)
+
+    month = np.datetime64(start, 'M')
+    lookback_start = (month - LOOKBACK_MONTHS[type]).astype('datetime64[D]').item()
+
+    factor_signals = scan_factor_signal_monthly(
+        monthly_factor_returns=_scan_monthly_factor_returns(start=lookback_start, end=end).collect().lazy(),
+        type=type
+    ).collect().lazy()
+
+    for lo, hi in _date_chunks(start, end, chunk_years):
+        yield (_alpha_from_asset_signal(
+            scan_asset_signal_daily(factor_signals, _scan_daily_asset_data(start=lo, end=hi)),
+            period='date'
+        )
+        .sort(['date', 'barrid'])
+        .collect(engine="streaming")
+        )
+
+
+@traced("alpha_daily")
+def alpha_daily(
+    start: dt.date,
+    end: dt.date,
+    type: str,
+    chunk_years: int = 1
+) -> pl.DataFrame:
+    """
+    Daily alphas (date, barrid, alpha), the daily counterpart of
+    alpha_monthly, in the format sfb.backtest_parallel takes. See
+    iter_alpha_daily to consume them a chunk at a time instead.
+    """
+
+    return pl.concat(list(iter_alpha_daily(start=start, end=end, type=type, chunk_years=chunk_years)), how="vertical")
+
+
+def _alpha_from_asset_signal(
+    asset_signal: pl.DataFrame | pl.LazyFrame,
+    ic: float = 0.05,
+    period: str = 'month'
+) -> pl.DataFrame | pl.LazyFrame:
+    
+    return (asset_signal
     .with_columns(
-        (pl.col('signal').sub(pl.col('signal').mean().over('month')) / pl.col('signal').std().over('month')).alias('score'),
-        pl.col('signal').mul(0).add(0.05).alias('IC'),
+        (pl.col('signal').sub(pl.col('signal').mean().over(period)) / pl.col('signal').std().over(period)).alias('score'),
+        pl.col('signal').mul(0).add(ic).alias('IC'),
         pl.col('specific_risk').mul(0.01)
     )
     .with_columns(
         pl.col('score').mul(pl.col('IC')).mul(pl.col('specific_risk')).alias('alpha')
     )
-    .rename({"month": "date"})
-    .select(['date', 'barrid', 'alpha'])
+    .select(pl.col(period).alias('date'), 'barrid', 'alpha')
     )
\ No newline at end of file
@@ -1,8 +1,9 @@
 import datetime as dt
+import os
 import polars as pl
 
-from ._wrappers import factorspace_signals_monthly, assetspace_signal_monthly, alpha_monthly
-from ._constants import TYPES
+from ._wrappers import factorspace_signals_monthly, assetspace_signal_monthly, alpha_monthly, alpha_monthly_since, profile_alpha_monthly, alpha_daily
+from ._constants import TYPES, get_tmp
 
 
 class FactorMomentumSignal:
@@ -19,5 +20,81 @@ class FactorMomentumSignal:
     def get_signal_monthly(self, start: dt.date, end: dt.date) -> pl.DataFrame:
         return assetspace_signal_monthly(start=start, end=end, type=self._type)
 
-    def get_alpha_monthly(self, start: dt.date, end: dt.date) -> pl.DataFrame:
-        return alpha_monthly(start=start, end=end, type=self._type)
\ No newline at end of file
+    def get_alpha_monthly(
+            self, start: dt.date, end: dt.date, debug: bool = False
+            ) -> pl.DataFrame | tuple[pl.DataFrame, str, pl.DataFrame]:
+        """
+        Monthly alphas. With debug=True, returns (alphas, optimized
+        query plan, per-node timings from LazyFrame.profile()) instead.
+        """
+
+        if debug:
+            return profile_alpha_monthly(start=start, end=end, type=self._type)
+
+        return alpha_monthly(start=start, end=end, type=self._type)
+
+    def get_alpha_monthly_since(self, first_month: dt.date, end: dt.date) -> pl.DataFrame:
+        """
+        Monthly alphas from first_month through end, built from just the
+        factor-return lookback the signal type needs. The rows match
+        get_alpha_monthly over any longer range, so consecutive periods
+        can be computed independently.
+        """
+
+        return alpha_monthly_since(first_month=first_month, end=end, type=self._type)
+
+    def get_alpha_daily(self, start: dt.date, end: dt.date) -> pl.DataFrame:
+        """
+        Daily alphas: each day's exposures times the latest monthly
+        factor signal. Like get_alpha_monthly_since, the rows for a date
+        do not depend on start.
+        """
+
+        return alpha_daily(start=start, end=end, type=self._type)
+
+    def _store_path(self) -> str:
+        tmp = get_tmp()
+        if tmp is None:
+            raise ValueError("No store path given and TMP is not set.")
+
+        return os.path.join(tmp, f"fm_alpha_{self._type.replace(' ', '_').replace('-', '_')}.parquet")
+
+    def update(self, as_of: dt.date, path: str | None = None, start: dt.date | None = None) -> pl.DataFrame:
+        """
+        Bring the alpha store at path (default: TMP/fm_alpha_<type>.parquet)
+        up to as_of and return the rows that were computed.
+
+        Only the months from the last stored month onward are computed
+        (the last month is redone in case it was stored part-way
+        through), using just the factor-return lookback the signal type
+        needs. The updated store is written to a temporary file and
+        swapped in with os.replace, so readers never see a partial
+        file. If no store exists yet, or it is empty, start is required
+        and the full history from start is built. as_of must not be
+        before the last stored month.
+        """
+
+        path = path or self._store_path()
+
+        stored = pl.read_parquet(path) if os.path.exists(path) else None
+
+        if stored is not None and not stored.is_empty():
+            first_month = stored['date'].max()
+            if as_of < first_month:
+                raise ValueError(
+                    f"The alpha store at {path} already runs to {first_month}; as_of {as_of} is before that."
+                )
+
+            new = alpha_monthly_since(first_month=first_month, end=as_of, type=self._type)
+            stored = stored.filter(pl.col('date') < first_month)
+        elif start is not None:
+            new = alpha_monthly(start=start, end=as_of, type=self._type)
+            stored = new.clear()
+        else:
+            raise ValueError(f"No alphas stored at {path}. Pass start to build the store.")
+
+        tmp = f"{path}.tmp-{os.getpid()}"
+        pl.concat([stored, new], how="vertical").sort(['date', 'barrid']).write_parquet(tmp)
+        os.replace(tmp, path)
+
+        return new
@@ -1,14 +1,18 @@
 import datetime as dt
+import itertools
+import multiprocessing
 import numpy as np
 import polars as pl
 import dataframely as dy
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from typing import TypeAlias
 from enum import StrEnum
 
-from factor_momentum import PcaEngine, FACTORS
-from sf_quant.data import load_factors
+from tqdm import tqdm
 
-from research.seasons import get_earnings_season_markers
+from factor_momentum import PcaEngine, StateCache, CalendarMasks, get_factors, scan_factors, span, traced
+
+from research.seasons import build_calendar_masks
 
 class PCReturnsSchema(dy.Schema):
     factor = dy.String()
@@ -35,6 +39,12 @@ PCReturnsDf: TypeAlias = dy.DataFrame[PCReturnsSchema]
 PCSignalsDf: TypeAlias = dy.DataFrame[PCSignalsSchema]
 PortReturnsDf: TypeAlias = dy.DataFrame[PortReturnsSchema]
 
+def _validate(schema: type[dy.Schema], df: pl.DataFrame) -> dy.DataFrame:
+    with span(f"{schema.__name__}.validate") as s:
+        s.rows = df.height
+        return schema.validate(df)
+
+
 class Interval(StrEnum):
     DAILY = "1d"
     MONTHLY = "1mo"
@@ -45,19 +55,28 @@ class EngineType(StrEnum):
 
 class FactorMomentumService:
 
-    def __init__(self, start: dt.date, end: dt.date):
+    def __init__(self, start: dt.date, end: dt.date, cache_dir: str | None = None):
         self.start = start
         self.end = end
         self.rolling_engine = None
         self.expanding_engine = None
+        self.state_cache = StateCache(cache_dir) if cache_dir is not None else None
+        self.__factor_returns = None
+        self.__calendar_masks = None
+        self.__filtered = {}
 
 
-    def __build_engine(self, n_components: int, lookback_window: int | None = None) -> None:
+    def __build_engine(self, n_components: int, lookback_window: int | None = None, mode: str = "refit", n_jobs: int = 1, solver: str = "eigh", exclude: list[str] | None = None) -> None:
         
+        row_weights = None
+        if exclude:
+            masks = self.get_calendar_masks()
+            row_weights = masks.weights(masks.any_of(*exclude))
+
         if lookback_window is None:
-            self.expanding_engine = PcaEngine(n_components=n_components, lookback_window=100)
+            self.expanding_engine = PcaEngine(n_components=n_components, lookback_window=100, mode=mode, n_jobs=n_jobs, cache=self.state_cache, row_weights=row_weights)
         else:
-            self.rolling_engine = PcaEngine(n_components=n_components, lookback_window=lookback_window)
+            self.rolling_engine = PcaEngine(n_components=n_components, lookback_window=lookback_window, mode=mode, n_jobs=n_jobs, cache=self.state_cache, solver=solver, row_weights=row_weights)
 
 
     def __process_monthly(self, df: pl.DataFrame) -> pl.DataFrame:
@@ -92,6 +111,48 @@ class FactorMomentumService:
         )
     
 
+    def __get_factor_returns(self) -> pl.DataFrame:
+        """
+        Daily factor returns for [start, end], sorted by date. Loaded from the data source on first use and kept
+        for the lifetime of the service.
+        """
+
+        if self.__factor_returns is None:
+            self.__factor_returns = scan_factors(self.start, self.end, get_factors()).collect().sort('date')
+
+        return self.__factor_returns
+
+
+    def get_calendar_masks(self) -> CalendarMasks:
+        """
+        Docstring for get_calendar_masks
+
+        :return: The registry of date masks over the trading dates of the cached factor returns (earnings_season and month_end built in). Register FOMC days or other date lists on it before running a pipeline with exclude.
+        :rtype: CalendarMasks
+        """
+        if self.__calendar_masks is None:
+            self.__calendar_masks = build_calendar_masks(self.__get_factor_returns()['date'])
+
+        return self.__calendar_masks
+
+
+    def __load_factor_returns(self, filter_earnings_season: bool) -> pl.LazyFrame:
+        """
+        Cached factor returns, with earnings-season dates removed by mask when filter_earnings_season is set. The same
+        LazyFrame is returned on every call, so an engine that has already materialized it does not collect it again.
+        """
+
+        if filter_earnings_season not in self.__filtered:
+            factor_returns = self.__get_factor_returns()
+
+            if filter_earnings_season:
+                factor_returns = factor_returns.filter(pl.Series(~self.get_calendar_masks().get("earnings_season")))
+
+            self.__filtered[filter_earnings_season] = factor_returns.lazy()
+
+        return self.__filtered[filter_earnings_season]
+
+
     def get_rolling_pcs(self, n_components: int, lookback_window: int, inter: Interval, filter_earnings_season: bool) -> PCReturnsDf:
         """
         Docstring for get_rolling_pcs
@@ -111,27 +172,37 @@ class FactorMomentumService:
             raise ValueError("Rolling PCA engine not built. Please call __build_engine with appropriate parameters before calling this method.")
 
         
-        factor_returns = load_factors(self.start, self.end, FACTORS)
-
-        if filter_earnings_season:
-            earnings_flags = get_earnings_season_markers(self.start, self.end)
-            factor_returns = factor_returns.join(earnings_flags, on='date', how='left').filter(pl.col('is_earnings_season').eq(0)).drop('is_earnings_season').sort('date').lazy()
-        
-        factor_returns = factor_returns.sort('date').lazy()
-        
+        factor_returns = self.__load_factor_returns(filter_earnings_season)
         
+        pc_rolling_returns = self.get_rolling_pcs_from_returns(factor_returns, inter)
+
+        print(pc_rolling_returns.collect_schema())
+        return _validate(PCReturnsSchema, pc_rolling_returns)
+
+
+    def get_rolling_pcs_from_returns(self, factor_returns: pl.LazyFrame, inter: Interval) -> pl.DataFrame:
+        """
+        Docstring for get_rolling_pcs_from_returns
+
+        :param factor_returns: Daily factor returns (date plus one column per factor), already filtered as required.
+        :type factor_returns: LazyFrame
+        :param inter: Defines the frequency of the output data.
+        :type inter: Interval
+        :return: The rolling principal component returns in long format (factor, date, ret, lag_ret), not yet validated.
+        :rtype: DataFrame
+        """
+        if self.rolling_engine is None:
+            raise ValueError("Rolling PCA engine not built. Please call __build_engine with appropriate parameters before calling this method.")
+
         if inter == Interval.MONTHLY:
             pc_rolling_returns = self.rolling_engine.fit_transform_rolling_monthly(factor_returns)
-            pc_rolling_returns = self.__process_monthly(pc_rolling_returns)
+            return self.__process_monthly(pc_rolling_returns)
         elif inter == Interval.DAILY:
             pc_rolling_returns = self.rolling_engine.fit_transform_rolling_daily(factor_returns)
-            pc_rolling_returns = self.__process_daily(pc_rolling_returns)
+            return self.__process_daily(pc_rolling_returns)
         else:
             raise ValueError(f"Invalid interval {inter}")
 
-        print(pc_rolling_returns.collect_schema())
-        return PCReturnsSchema.validate(pc_rolling_returns)
-
 
     def get_expanding_pcs(self, n_components: int, filter_earnings_season: bool) -> PCReturnsDf:
         """
@@ -146,18 +217,11 @@ class FactorMomentumService:
             raise ValueError("Expanding PCA engine not built. Please call __build_engine with appropriate parameters before calling this method.")
 
 
-        factor_returns = load_factors(self.start, self.end, FACTORS)
-
-        if filter_earnings_season:
-            earnings_flags = get_earnings_season_markers(self.start, self.end)
-            factor_returns = factor_returns.join(earnings_flags, on='date', how='left').filter(pl.col('is_earnings_season').eq(0)).drop('is_earnings_season').sort('date').lazy()
-        
-        factor_returns = factor_returns.sort('date').lazy()
-
+        factor_returns = self.__load_factor_returns(filter_earnings_season)
 
         pc_rolling_returns = self.expanding_engine.fit_transform_expanding_monthly(self.start, factor_returns)
 
-        return PCReturnsSchema.validate(self.__process_monthly(pc_rolling_returns))
+        return _validate(PCReturnsSchema, self.__process_monthly(pc_rolling_returns))
 
 
     def build_cross_sectional_signals(self, pc_returns: PCReturnsDf) -> PCSignalsDf:
@@ -169,21 +233,27 @@ class FactorMomentumService:
         :return: A DataFrame containing the cross-sectional signals for each date, based on the principal components.
         :rtype: DataFrame
         """
+        # Ranks below the middle are losers and above it winners, as in
+        # construct_factor_signal_monthly, so the buckets stay balanced
+        # for any number of components (the median bucket is empty when
+        # it is even).
         signals = (pc_returns.with_columns(
-            pl.col('lag_ret').rank('dense').over('date').alias('rank')
+            pl.col('lag_ret').rank('dense').over('date').alias('rank'),
+            pl.col('lag_ret').count().over('date').alias('count')
         )
         .with_columns(
-            pl.when(pl.col('rank') < 3)
+            pl.when(pl.col('rank') < pl.col('count')*0.5+0.5)
             .then(-1)
-            .when(pl.col('rank') > 3)
+            .when(pl.col('rank') > pl.col('count')*0.5+0.5)
             .then(1)
             .otherwise(0)
             .alias('signal')
         )
+        .drop('count')
         .drop_nulls()
         )
 
-        return PCSignalsSchema.validate(signals)
+        return _validate(PCSignalsSchema, signals)
     
 
     def build_portfolios(self, signals: PCSignalsDf) -> PortReturnsDf:
@@ -201,6 +271,13 @@ class FactorMomentumService:
         )
         .sort('date')
         .pivot(on='signal', index='date')
+        )
+
+        # A bucket nobody falls into (the median for an even number of
+        # components) holds nothing and returns 0.
+        ports = (ports.with_columns(
+            [pl.lit(0.0).alias(bucket) for bucket in ['-1', '0', '1'] if bucket not in ports.columns]
+        )
         .with_columns(
             (pl.col('1') - pl.col('-1')).alias('ls')
         )
@@ -211,12 +288,13 @@ class FactorMomentumService:
         })
         )
 
-        return PortReturnsSchema.validate(ports)
+        return _validate(PortReturnsSchema, ports)
     
 
-    def run_expanding_pipeline(self, n_components: int, filter_earnings_season: bool = False) -> tuple[PortReturnsDf, PCSignalsDf, PCReturnsDf]:
+    @traced("FactorMomentumService.run_expanding_pipeline")
+    def run_expanding_pipeline(self, n_components: int, filter_earnings_season: bool = False, mode: str = "refit", n_jobs: int = 1, exclude: list[str] | None = None) -> tuple[PortReturnsDf, PCSignalsDf, PCReturnsDf]:
         
-        self.__build_engine(n_components=n_components, lookback_window=None)
+        self.__build_engine(n_components=n_components, lookback_window=None, mode=mode, n_jobs=n_jobs, exclude=exclude)
 
         pc_returns = self.get_expanding_pcs(n_components, filter_earnings_season)
         signals = self.build_cross_sectional_signals(pc_returns)
@@ -225,9 +303,10 @@ class FactorMomentumService:
         return ports, signals, pc_returns
 
 
-    def run_rolling_pipeline(self, n_components: int, lookback_window: int, interval: Interval, filter_earnings_season: bool = False) -> tuple[PortReturnsDf, PCSignalsDf, PCReturnsDf]:
+    @traced("FactorMomentumService.run_rolling_pipeline")
+    def run_rolling_pipeline(self, n_components: int, lookback_window: int, interval: Interval, filter_earnings_season: bool = False, mode: str = "refit", n_jobs: int = 1, solver: str = "eigh", exclude: list[str] | None = None) -> tuple[PortReturnsDf, PCSignalsDf, PCReturnsDf]:
         
-        self.__build_engine(n_components=n_components, lookback_window=lookback_window)
+        self.__build_engine(n_components=n_components, lookback_window=lookback_window, mode=mode, n_jobs=n_jobs, solver=solver, exclude=exclude)
         
         pc_returns = self.get_rolling_pcs(n_components, lookback_window, interval, filter_earnings_season)
         signals = self.build_cross_sectional_signals(pc_returns)
@@ -236,14 +315,58 @@ class FactorMomentumService:
         return ports, signals, pc_returns
     
 
-    def extract_loadings_dict(self, engine_type="rolling", pc: int | None = None) -> dict[str, np.ndarray]:
+    @traced("FactorMomentumService.run_rolling_sweep")
+    def run_rolling_sweep(
+            self, n_components: list[int], lookback_window: list[int], interval: list[Interval],
+            filter_earnings_season: tuple[bool, ...] = (False,), mode: str = "refit", n_jobs: int = 1
+            ) -> pl.DataFrame:
         """
-        Docstring for extract_loadings
-
-        :param engine_type: Specifies which PCA engine to extract loadings from. Must be either "rolling" or "expanding". Defaults to "rolling".
-        :type engine_type: str, optional
-        :return: A dictionary where the keys are the dates corresponding to each PCA fit, and the values are the loading matrices (as numpy arrays) for the principal components at those dates.
+        Docstring for run_rolling_sweep
+
+        Runs the rolling pipeline for every combination of the given parameters. Factor returns are loaded once.
+        Configurations that differ only in n_components share one PCA fit with the largest n_components, since
+        the leading k components of that fit are the k-component fit. Each (lookback_window, interval,
+        filter_earnings_season) group runs in its own worker process when n_jobs > 1.
+
+        :param n_components: Values of n_components to sweep. Each must be at least 2, so there are winners and losers to trade.
+        :type n_components: list[int]
+        :param lookback_window: Values of lookback_window to sweep.
+        :type lookback_window: list[int]
+        :param interval: Values of Interval to sweep.
+        :type interval: list[Interval]
+        :param filter_earnings_season: Values of filter_earnings_season to sweep. Defaults to (False,).
+        :type filter_earnings_season: Sequence[bool], optional
+        :param mode: PcaEngine mode used for every fit. Defaults to "refit".
+        :type mode: str, optional
+        :param n_jobs: Number of worker processes. Defaults to 1 (run in this process).
+        :type n_jobs: int, optional
+        :return: The PortReturnsDf of every configuration stacked, keyed by n_components, lookback_window, interval and filter_earnings_season.
+        :rtype: DataFrame
         """
+        n_components = sorted(set(n_components))
+        if not n_components or n_components[0] < 2:
+            raise ValueError(f"Invalid n_components {n_components}. Each must be at least 2.")
+
+        groups = list(itertools.product(lookback_window, [Interval(inter) for inter in interval], filter_earnings_season))
+        tasks = [
+            (self.start, self.end, self.__load_factor_returns(filter_es).collect(), lookback, inter, filter_es, n_components, mode)
+            for lookback, inter, filter_es in groups
+        ]
+
+        if n_jobs > 1:
+            # polars is not fork-safe once its thread pool is running, so workers are spawned.
+            with ProcessPoolExecutor(max_workers=n_jobs, mp_context=multiprocessing.get_context("spawn")) as pool:
+                futures = {pool.submit(_run_sweep_group, *task): i for i, task in enumerate(tasks)}
+                results = [None] * len(tasks)
+                for future in tqdm(as_completed(futures), total=len(futures), desc="Parameter sweep"):
+                    results[futures[future]] = future.result()
+        else:
+            results = [_run_sweep_group(*task) for task in tqdm(tasks, desc="Parameter sweep")]
+
+        return pl.concat(itertools.chain.from_iterable(results), how="vertical")
+
+
+    def __get_engine(self, engine_type: str) -> PcaEngine:
 
         if engine_type not in ["rolling", "expanding"]:
             raise ValueError("Invalid engine_type. Must be either 'rolling' or 'expanding'.")
@@ -251,22 +374,34 @@ class FactorMomentumService:
         if engine_type == "rolling":
             if self.rolling_engine is None:
                 raise ValueError("Rolling PCA engine not built. Please call __build_engine with appropriate parameters before calling this method.")
-            engine = self.rolling_engine
-            states = self.rolling_engine.states
+            return self.rolling_engine
         else:
             if self.expanding_engine is None:
                 raise ValueError("Expanding PCA engine not built. Please call __build_engine with appropriate parameters before calling this method.")
-            engine = self.expanding_engine
-            states = self.expanding_engine.states
+            return self.expanding_engine
+
+
+    def extract_loadings_dict(self, engine_type="rolling", pc: int | None = None) -> dict[str, np.ndarray]:
+        """
+        Docstring for extract_loadings
+
+        :param engine_type: Specifies which PCA engine to extract loadings from. Must be either "rolling" or "expanding". Defaults to "rolling".
+        :type engine_type: str, optional
+        :return: A dictionary where the keys are the dates corresponding to each PCA fit, and the values are the loading matrices (as numpy arrays) for the principal components at those dates.
+        """
+
+        engine = self.__get_engine(engine_type)
+        states = engine.states
+        valid = states.valid
 
         if pc is not None:
             if pc > engine.n_components - 1:
                 raise ValueError(f"Requested PC {pc} exceeds the number of components in the engine ({engine.n_components}).")
             
-            return {key: states[key]['components'][pc] for key in states.keys() if states[key]}
+            return dict(zip(states.dates[valid].tolist(), states.components[valid, pc]))
         
         
-        return {key: states[key]['components'] for key in states.keys()}
+        return dict(zip(states.dates[valid].tolist(), states.components[valid]))
     
 
     def extract_loadings_df_for_pc(self, engine_type="rolling", pc: int = 0) -> pl.DataFrame:
@@ -279,17 +414,51 @@ class FactorMomentumService:
         :type pc: int, optional
         :return: A DataFrame containing the loadings for the specified principal component across all dates in the PCA engine's states.
         """
-        loadings_dict = self.extract_loadings_dict(engine_type=engine_type, pc=pc)
+        engine = self.__get_engine(engine_type)
+
+        if pc > engine.n_components - 1:
+            raise ValueError(f"Requested PC {pc} exceeds the number of components in the engine ({engine.n_components}).")
+
+        states = engine.states
+        loadings = states.components[states.valid, pc]
         
         return (pl.DataFrame(
-            [
-                {"date": k, **{f"{FACTORS[i][8:].lower()}": v[i] for i in range(len(v))}}
-                for k, v in loadings_dict.items()
-            ]
+            {"date": states.dates[states.valid], **{f"{get_factors()[i][8:].lower()}": loadings[:, i] for i in range(loadings.shape[1])}}
         )
         .sort("date")
         )
     
 
     def overwrite_pc_loadings_by_df(self, df: pl.DataFrame) -> None:
-        pass
\ No newline at end of file
+        pass
+
+
+def _run_sweep_group(
+        start: dt.date, end: dt.date, factor_returns: pl.DataFrame, lookback_window: int, interval: Interval,
+        filter_earnings_season: bool, n_components: list[int], mode: str
+        ) -> list[pl.DataFrame]:
+    """
+    One run_rolling_sweep group: fit once with the largest n_components,
+    then build portfolios from the leading k PCs for every k.
+    """
+
+    service = FactorMomentumService(start, end)
+    service.rolling_engine = PcaEngine(n_components=max(n_components), lookback_window=lookback_window, mode=mode)
+    service.rolling_engine.progress = False
+
+    pc_returns = service.get_rolling_pcs_from_returns(factor_returns.lazy(), interval)
+
+    ports = []
+    for k in n_components:
+        subset = _validate(PCReturnsSchema, pc_returns.filter(pl.col('factor').is_in([f"pc{i}" for i in range(k)])))
+        signals = service.build_cross_sectional_signals(subset)
+
+        ports.append(service.build_portfolios(signals).select(
+            pl.lit(k).alias('n_components'),
+            pl.lit(lookback_window).alias('lookback_window'),
+            pl.lit(str(interval)).alias('interval'),
+            pl.lit(filter_earnings_season).alias('filter_earnings_season'),
+            pl.all(),
+        ))
+
+    return ports
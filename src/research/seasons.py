@@ -1,14 +1,21 @@
 import polars as pl
 import datetime as dt
 
-def get_earnings_season_markers(start: dt.date, end: dt.date) -> pl.DataFrame:
+from factor_momentum import CalendarMasks
+
+def earnings_season_expr(column: str = "date") -> pl.Expr:
     
-    quater_filter: pl.Expr = (
-        pl.col("date").dt.ordinal_day().is_between(15, 36)   |  # Jan 15–Feb 5
-        pl.col("date").dt.ordinal_day().is_between(105, 125) |  # Apr 15–May 5
-        pl.col("date").dt.ordinal_day().is_between(196, 217) |  # Jul 15–Aug 5
-        pl.col("date").dt.ordinal_day().is_between(288, 309)    # Oct 15–Nov 5
+    return (
+        pl.col(column).dt.ordinal_day().is_between(15, 36)   |  # Jan 15–Feb 5
+        pl.col(column).dt.ordinal_day().is_between(105, 125) |  # Apr 15–May 5
+        pl.col(column).dt.ordinal_day().is_between(196, 217) |  # Jul 15–Aug 5
+        pl.col(column).dt.ordinal_day().is_between(288, 309)    # Oct 15–Nov 5
     )
+
+
+def get_earnings_season_markers(start: dt.date, end: dt.date) -> pl.DataFrame:
+    
+    quater_filter: pl.Expr = earnings_season_expr("date")
     
     return (pl.date_range(
         start, end, interval="1d", eager=True
@@ -19,3 +26,24 @@ def get_earnings_season_markers(start: dt.date, end: dt.date) -> pl.DataFrame:
     )
     )
 
+
+def build_calendar_masks(
+        dates: list[dt.date] | pl.Series, fomc_dates: list[dt.date] | None = None, extra: dict[str, list[dt.date]] | None = None
+) -> CalendarMasks:
+    """
+    Standard mask registry over a trading calendar: earnings_season,
+    month_end, fomc (when fomc_dates is given) and one mask per entry
+    of extra.
+    """
+
+    masks = CalendarMasks(dates)
+    masks.register_expr("earnings_season", earnings_season_expr("date"))
+    masks.register_month_ends("month_end")
+
+    if fomc_dates is not None:
+        masks.register_dates("fomc", fomc_dates)
+
+    for name, days in (extra or {}).items():
+        masks.register_dates(name, days)
+
+    return masks
@@ -0,0 +1,49 @@
+import datetime as dt
+
+import numpy as np
+import polars as pl
+import pytest
+
+from benchmarks.synthetic import SyntheticWorld
+from factor_momentum import FactorMomentumSignal
+from factor_momentum._providers import set_provider
+from factor_momentum._wrappers import alpha_monthly
+
+
+@pytest.fixture
+def world():
+    world = SyntheticWorld(900, 40, ["A", "B", "C", "D"], seed=2)
+    world.install()
+    yield world
+    set_provider(None)
+
+
+@pytest.mark.parametrize("type", ["1m cross-section", "12m time-series continuous"])
+def test_update_matches_a_full_rebuild(world, tmp_path, type):
+    path = str(tmp_path / "alpha.parquet")
+    start, end = dt.date(1985, 1, 1), dt.date(1988, 6, 30)
+    signal = FactorMomentumSignal(type)
+
+    signal.update(dt.date(1987, 3, 15), path=path, start=start)
+    new = signal.update(end, path=path)
+
+    assert new['date'].min() == dt.date(1987, 3, 1)
+
+    stored = pl.read_parquet(path)
+    full = alpha_monthly(start, end, type).sort(['date', 'barrid'])
+
+    assert stored.select('date', 'barrid').equals(full.select('date', 'barrid'))
+    np.testing.assert_allclose(stored['alpha'].to_numpy(), full['alpha'].to_numpy(), rtol=1e-9, atol=1e-12)
+
+
+def test_update_rejects_missing_store_and_as_of_in_the_past(world, tmp_path):
+    path = str(tmp_path / "alpha.parquet")
+    signal = FactorMomentumSignal("1m cross-section")
+
+    with pytest.raises(ValueError, match="Pass start"):
+        signal.update(dt.date(1987, 3, 31), path=path)
+
+    signal.update(dt.date(1987, 3, 31), path=path, start=dt.date(1985, 1, 1))
+
+    with pytest.raises(ValueError, match="before that"):
+        signal.update(dt.date(1986, 12, 31), path=path)
@@ -0,0 +1,79 @@
+import datetime as dt
+
+import polars as pl
+import pytest
+
+from benchmarks.synthetic import SyntheticWorld
+from factor_momentum import _loaders
+from factor_momentum._providers import set_provider
+
+
+class CountingWorld(SyntheticWorld):
+    """
+    SyntheticWorld served through the loaders' Parquet cache, recording
+    every fetch as (source, start, end, columns).
+    """
+
+    cache_name = "test_cache"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fetches = []
+
+    def load_factors(self, start, end, factors):
+        self.fetches.append(("factors", start, end, factors))
+        return super().load_factors(start, end, factors)
+
+    def load_assets(self, start, end, columns):
+        self.fetches.append(("assets", start, end, columns))
+        return super().load_assets(start, end, columns)
+
+
+@pytest.fixture
+def world(tmp_path, monkeypatch):
+    world = CountingWorld(1500, 3, ["A", "B", "C"])
+    monkeypatch.setattr(_loaders, "get_tmp", lambda: str(tmp_path))
+    set_provider(world)
+    yield world
+    set_provider(None)
+
+
+def test_historical_range_ending_on_a_weekend_is_cached(world):
+    # 1987-12-27 is a Sunday; the provider has data well past it.
+    start, end = dt.date(1986, 1, 1), dt.date(1987, 12, 27)
+
+    first = _loaders.scan_factors(start, end, ["A", "B"]).collect()
+    n = len(world.fetches)
+
+    second = _loaders.scan_factors(start, end, ["A", "B"]).collect()
+
+    assert len(world.fetches) == n
+    assert first.equals(second)
+
+
+def test_new_columns_are_merged_into_cached_years(world):
+    start, end = dt.date(1986, 1, 1), dt.date(1987, 12, 31)
+    _loaders.scan_factors(start, end, ["A"]).collect()
+    world.fetches.clear()
+
+    wide = _loaders.scan_factors(start, end, ["A", "B"]).collect()
+
+    # Only the missing column is fetched, once per cached year.
+    assert [f[3] for f in world.fetches] == [["B"], ["B"]]
+    assert wide.equals(world.load_factors(start, end, ["A", "B"]))
+
+    # The narrower set is still served from the cache.
+    world.fetches.clear()
+    _loaders.scan_factors(start, end, ["A"]).collect()
+    _loaders.scan_factors(dt.date(1986, 3, 1), dt.date(1986, 6, 30), ["B", "A"]).collect()
+    assert world.fetches == []
+
+
+def test_new_columns_keep_rows_aligned_by_barrid(world):
+    start, end = dt.date(1986, 1, 1), dt.date(1986, 3, 31)
+    _loaders.scan_assets(start, end, ["date", "barrid", "return"]).collect()
+
+    merged = _loaders.scan_assets(start, end, ["date", "barrid", "return", "market_cap"]).collect()
+    expected = world.load_assets(start, end, ["date", "barrid", "return", "market_cap"])
+
+    assert merged.sort(["date", "barrid"]).equals(expected.sort(["date", "barrid"]))
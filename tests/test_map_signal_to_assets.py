@@ -0,0 +1,26 @@
+import datetime as dt
+
+import pytest
+
+from benchmarks.synthetic import SyntheticWorld
+from factor_momentum._providers import set_provider
+from factor_momentum._wrappers import _alpha_from_asset_signal, alpha_monthly, assetspace_signal_monthly
+
+
+@pytest.fixture
+def world():
+    world = SyntheticWorld(700, 50, ["A", "B", "C", "D"], seed=1)
+    world.install()
+    yield world
+    set_provider(None)
+
+
+@pytest.mark.parametrize("type", ["1m cross-section", "12m time-series discrete"])
+def test_lazy_alpha_matches_eager_mapping(world, type):
+    start, end = dt.date(1986, 1, 1), dt.date(1987, 6, 30)
+
+    lazy = alpha_monthly(start, end, type)
+    eager = _alpha_from_asset_signal(assetspace_signal_monthly(start, end, type))
+
+    assert not lazy.is_empty()
+    assert lazy.sort(['date', 'barrid']).equals(eager.sort(['date', 'barrid']))
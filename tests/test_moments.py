@@ -0,0 +1,42 @@
+import numpy as np
+
+from factor_momentum._moments import CumulativeMoments, SlidingMoments
+
+
+def _reference(X: np.ndarray):
+    mean = X.mean(axis=0)
+    scale = X.std(axis=0)
+    Z = (X - mean) / scale
+
+    return mean, scale, Z.T @ Z / len(Z)
+
+
+def _assert_standardized(moments, X: np.ndarray):
+    for got, want in zip(moments.standardized(), _reference(X)):
+        np.testing.assert_allclose(got, want, rtol=1e-9, atol=1e-12)
+
+
+def test_sliding_moments_follow_the_window():
+    X = np.random.default_rng(0).normal(size=(300, 5)) + 10
+    moments = SlidingMoments(5, shift=X.mean(axis=0))
+
+    lo = hi = 0
+    for new_lo, new_hi in [(0, 60), (10, 80), (50, 120), (119, 200), (150, 300)]:
+        moments.remove(X[lo:new_lo])
+        moments.add(X[hi:new_hi])
+        lo, hi = new_lo, new_hi
+
+        _assert_standardized(moments, X[lo:hi])
+
+
+def test_cumulative_moments_fold_in_batches():
+    X = np.random.default_rng(1).normal(size=(300, 5)) * 3 + 100
+    moments = CumulativeMoments(5)
+
+    hi = 0
+    for new_hi in [1, 2, 40, 41, 200, 300]:
+        moments.add(X[hi:new_hi])
+        hi = new_hi
+
+        if hi > 1:
+            _assert_standardized(moments, X[:hi])
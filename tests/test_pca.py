@@ -0,0 +1,77 @@
+import numpy as np
+
+from benchmarks.synthetic import factor_returns
+from factor_momentum import PcaEngine
+
+
+def _returns(n_days: int, n_factors: int, seed: int = 0):
+    return factor_returns(n_days, [f"F{i}" for i in range(n_factors)], seed=seed).lazy()
+
+
+def _engine(**kwargs) -> PcaEngine:
+    engine = PcaEngine(3, 100, **kwargs)
+    engine.progress = False
+
+    return engine
+
+
+def test_subspace_fit_does_not_depend_on_earlier_fits():
+    returns = _returns(400, 6, seed=1)
+
+    fresh = _engine(mode="incremental", solver="subspace")
+    fresh.fit_transform_rolling_monthly(returns)
+
+    reused = _engine(mode="incremental", solver="subspace")
+    reused.fit_transform_rolling_monthly(_returns(400, 4, seed=2))
+    reused.states = type(reused.states)(3)
+    reused.fit_transform_rolling_monthly(returns)
+
+    v = fresh.states.valid
+    assert v.any()
+    np.testing.assert_array_equal(reused.states.valid, v)
+    np.testing.assert_allclose(reused.states.components[v], fresh.states.components[v])
+    assert reused.iterations == fresh.iterations
+
+
+def _fit(window: str, **kwargs) -> tuple[PcaEngine, object]:
+    returns = _returns(600, 6, seed=3)
+    engine = _engine(**kwargs)
+
+    if window == "rolling":
+        pcs = engine.fit_transform_rolling_monthly(returns)
+    else:
+        pcs = engine.fit_transform_expanding_monthly(returns.collect()['date'][0], returns)
+
+    return engine, pcs
+
+
+def _assert_matches_refit(window: str, **kwargs):
+    refit, expected = _fit(window, mode="refit")
+    engine, pcs = _fit(window, **kwargs)
+
+    np.testing.assert_array_equal(engine.states.dates, refit.states.dates)
+    np.testing.assert_array_equal(engine.states.valid, refit.states.valid)
+
+    v = refit.states.valid
+    assert v.sum() > 10
+    for field in ["mean", "scale", "components", "explained_var"]:
+        np.testing.assert_allclose(getattr(engine.states, field)[v], getattr(refit.states, field)[v], rtol=1e-6, atol=1e-9)
+
+    assert pcs.columns == expected.columns
+    np.testing.assert_allclose(pcs.drop('date', 'state').to_numpy(), expected.drop('date', 'state').to_numpy(), rtol=1e-6, atol=1e-9)
+
+
+def test_incremental_rolling_matches_refit():
+    _assert_matches_refit("rolling", mode="incremental")
+
+
+def test_batched_rolling_matches_refit():
+    _assert_matches_refit("rolling", mode="batched")
+
+
+def test_batched_expanding_matches_refit():
+    _assert_matches_refit("expanding", mode="batched")
+
+
+def test_incremental_expanding_matches_refit():
+    _assert_matches_refit("expanding", mode="incremental")
@@ -0,0 +1,55 @@
+import datetime as dt
+
+import numpy as np
+import pytest
+
+from factor_momentum._pca_states import PcaStates
+
+
+def _state(F: int, k: int, seed: int = 0) -> dict:
+    rng = np.random.default_rng(seed)
+
+    return {
+        "mean": rng.normal(size=F),
+        "scale": rng.uniform(0.5, 1.5, size=F),
+        "components": rng.normal(size=(k, F)),
+        "explained_var": rng.uniform(size=k),
+    }
+
+
+def test_none_then_state_for_same_date():
+    # The date is first stored without a width (a skipped fit before
+    # n_features is known), then gets a real state.
+    date = dt.date(2020, 1, 31)
+    states = PcaStates(2)
+
+    states[date] = None
+    assert states[date] is None
+
+    state = _state(4, 2)
+    states[date] = state
+
+    assert len(states) == 1
+    np.testing.assert_array_equal(states[date]["components"], state["components"])
+    np.testing.assert_array_equal(states[date]["mean"], state["mean"])
+
+
+def test_appending_one_date_at_a_time_keeps_earlier_rows():
+    states = PcaStates(2)
+    dates = [dt.date(2020, 1, 1) + dt.timedelta(days=i) for i in range(50)]
+    fitted = {date: _state(3, 2, seed=i) for i, date in enumerate(dates)}
+
+    for date in dates:
+        states[date] = fitted[date]
+
+    assert states.keys() == dates
+    for date in dates:
+        np.testing.assert_array_equal(states[date]["scale"], fitted[date]["scale"])
+
+
+def test_rows_rejects_unreserved_dates():
+    states = PcaStates(2)
+    states[dt.date(2020, 1, 1)] = _state(3, 2)
+
+    with pytest.raises(KeyError):
+        states.rows([dt.date(2020, 1, 2)])